@@ -0,0 +1,46 @@
+import httpx
+from typing import Callable, Optional
+from fastapi import Depends, HTTPException, Request
+from app.core import deadline
+from app.core.cache import BaseCache
+from app.core.config import settings
+from app.services.perplexity_service import PerplexityService
+from app.services.trending_refresher import TrendingRefresher
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http_client
+
+def get_analysis_cache(request: Request) -> BaseCache:
+    return request.app.state.analysis_cache
+
+def get_trending_refresher(request: Request) -> TrendingRefresher:
+    return request.app.state.trending_refresher
+
+def get_perplexity_service(
+    client: httpx.AsyncClient = Depends(get_http_client),
+    cache: BaseCache = Depends(get_analysis_cache)
+) -> PerplexityService:
+    return PerplexityService(client=client, cache=cache)
+
+def request_deadline(default: Optional[float]) -> Callable:
+    """
+    Dependency setting the request's deadline for upstream calls.
+    
+    Clients may pass ``X-Request-Timeout`` (seconds, clamped to
+    PERPLEXITY_DEADLINE_MIN/MAX_SECONDS); otherwise ``default`` applies, and
+    None means no deadline.
+    """
+    async def dependency(request: Request) -> Optional[float]:
+        seconds = default
+        header = request.headers.get("X-Request-Timeout")
+        if header:
+            try:
+                seconds = float(header)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="X-Request-Timeout must be a number of seconds")
+            seconds = min(max(seconds, settings.PERPLEXITY_DEADLINE_MIN_SECONDS), settings.PERPLEXITY_DEADLINE_MAX_SECONDS)
+        if seconds:
+            deadline.set_deadline(seconds)
+        return seconds
+    
+    return dependency
@@ -1,12 +1,12 @@
 from fastapi import APIRouter
-from app.core.database import supabase
+from app.repositories.posts import PostRepository
 
 router = APIRouter()
 
 @router.get("/")
 async def health_check():
     try:
-        response = supabase.table("posts").select("id").limit(1).execute()
+        await PostRepository().ping()
         db_status = "connected"
     except Exception as e:
         db_status = f"error: {str(e)}"
@@ -1,13 +1,21 @@
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
-from typing import Optional
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from app.services.perplexity_service import PerplexityService
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from app.services.perplexity_service import PerplexityService, perplexity_breaker, perplexity_hedger
+from app.core.cache import BaseCache
 from app.core.config import settings
+from app.core.rate_limit import limiter, tier_limit
+from app.core.responses import FastJSONResponse, ORJSON_OPTIONS, sse_event
+from app.services.trending_refresher import TrendingRefresher
+from app.api.deps import get_analysis_cache, get_perplexity_service, get_trending_refresher, request_deadline
 
-router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# Single analyses get a default deadline; batches only when the client asks for one
+analysis_deadline = request_deadline(settings.PERPLEXITY_DEADLINE_SECONDS)
+batch_deadline = request_deadline(None)
 
 class MemeAnalysisRequest(BaseModel):
     title: str
@@ -16,19 +24,36 @@ class MemeAnalysisRequest(BaseModel):
     num_comments: Optional[int] = 0
     age_hours: Optional[float] = 0
 
-@router.post("/analyze-meme")
-@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
-async def analyze_meme(request: Request, meme: MemeAnalysisRequest):
+class MemeBatchRequest(BaseModel):
+    items: List[MemeAnalysisRequest] = Field(..., min_length=1, max_length=settings.PERPLEXITY_BATCH_MAX_ITEMS)
+    concurrency: Optional[int] = Field(None, ge=1, le=settings.PERPLEXITY_BATCH_CONCURRENCY)
+    pack_size: Optional[int] = Field(None, ge=1, le=settings.PERPLEXITY_PACK_MAX_SIZE)
+
+@router.post("/analyze-meme", dependencies=[Depends(analysis_deadline)])
+@limiter.limit(tier_limit)
+async def analyze_meme(
+    request: Request,
+    meme: MemeAnalysisRequest,
+    service: PerplexityService = Depends(get_perplexity_service)
+):
     """
     Analyze if a meme/post will go viral using Perplexity AI.
     
     This uses real-time web search to check if the topic is trending.
+    While Perplexity is unavailable a heuristic estimate is returned with
+    ``fallback`` set.
     """
     try:
-        service = PerplexityService()
         result = await service.analyze_meme_virality(meme.dict())
         
-        if result["success"]:
+        if result.get("fallback"):
+            return {
+                "success": True,
+                "analysis": result["prediction"],
+                "fallback": True,
+                "message": "Perplexity unavailable; heuristic estimate"
+            }
+        elif result["success"]:
             return {
                 "success": True,
                 "analysis": result["prediction"],
@@ -45,28 +70,106 @@ async def analyze_meme(request: Request, meme: MemeAnalysisRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/analyze-meme/stream", dependencies=[Depends(analysis_deadline)])
+@limiter.limit(tier_limit)
+async def analyze_meme_stream(
+    request: Request,
+    meme: MemeAnalysisRequest,
+    deltas: bool = False,
+    service: PerplexityService = Depends(get_perplexity_service)
+):
+    """
+    Streaming variant of /analyze-meme, as Server-Sent Events.
+    
+    Each prediction field is sent as a ``field`` event as soon as the model
+    has produced it (``will_go_viral`` and ``virality_score`` come first),
+    followed by one ``analysis`` event with the whole prediction, or an
+    ``error`` event. With ``deltas=true`` the raw completion text is relayed
+    as ``delta`` events too.
+    """
+    async def events():
+        async for event in service.stream_meme_virality(meme.dict(), deltas):
+            name = event.pop("event")
+            yield sse_event(name, event)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/analyze-batch", dependencies=[Depends(batch_deadline)])
+@limiter.limit(tier_limit)
+async def analyze_batch(
+    request: Request,
+    batch: MemeBatchRequest,
+    service: PerplexityService = Depends(get_perplexity_service)
+):
+    """
+    Analyze a list of posts in one request.
+    
+    Items are analyzed concurrently and streamed back as NDJSON, one line per
+    item in completion order; each line carries the item's ``index``. Up to
+    ``pack_size`` posts share one upstream call.
+    """
+    async def stream():
+        async for result in service.analyze_batch([item.dict() for item in batch.items], batch.concurrency, batch.pack_size):
+            if result["success"]:
+                line = {"index": result["index"], "success": True, "analysis": result["prediction"]}
+                if result.get("fallback"):
+                    line["fallback"] = True
+            else:
+                line = {"index": result["index"], "success": False, "error": result.get("error", "Unknown error")}
+            yield orjson.dumps(line, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @router.get("/trending-now")
-@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
-async def get_trending_now(request: Request):
+@limiter.limit(tier_limit)
+async def get_trending_now(request: Request, refresher: TrendingRefresher = Depends(get_trending_refresher)):
     """
     Get current trending topics across the web.
+    
+    Served from the background-refreshed copy; ``freshness`` tells how old it is.
     """
     try:
-        service = PerplexityService()
-        result = await service.get_trending_topics()
+        result = await refresher.get()
         
         if result["success"]:
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "trending": result["data"],
+                "freshness": result["freshness"],
                 "message": "Trending topics retrieved"
-            }
+            })
         else:
-            return {
+            return FastJSONResponse({
                 "success": False,
                 "error": result.get("error"),
+                "freshness": result["freshness"],
                 "message": "Unable to fetch trending topics"
-            }
+            })
             
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache-stats")
+async def get_cache_stats(cache: BaseCache = Depends(get_analysis_cache)):
+    """
+    Hit/miss counters for the meme analysis response cache.
+    """
+    return {
+        "success": True,
+        "cache": await cache.stats()
+    }
+
+@router.get("/upstream")
+async def get_upstream_status():
+    """
+    Circuit breaker and hedging state of the Perplexity client in this process.
+    """
+    return {
+        "success": True,
+        "breaker": perplexity_breaker.snapshot(),
+        "hedging": {**perplexity_hedger.stats(), "enabled": settings.PERPLEXITY_HEDGE_ENABLED}
+    }
@@ -1,52 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from typing import List, Optional
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from app.services.prediction_service import PredictionService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import orjson
+from app.services.prediction_service import PredictionService, TRENDING_LIMIT
+from app.services.leaderboard_store import leaderboard_store
 from app.core.config import settings
+from app.core.rate_limit import limiter, tier_limit
+from app.core.http_cache import cache_headers, etag_matches, make_etag
+from app.core.pagination import Cursor, decode_cursor, encode_cursor
+from app.core.responses import FastJSONResponse, ORJSON_OPTIONS
+from app.core.singleflight import SingleFlight
 
-router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# Identical concurrent requests (e.g. every dashboard polling right after a
+# collection) share one query and scoring pass
+flight = SingleFlight()
+
+async def validate_cache(request: Request) -> Tuple[int, Dict[str, str], bool]:
+    """
+    Resolve the dataset version, response ETag and caching headers.
+    
+    Also reports whether the client already holds this version, so the
+    endpoint can answer 304 without any database or scoring work.
+    """
+    version = await leaderboard_store.version()
+    etag = make_etag(version, request)
+    headers = cache_headers(etag, settings.PREDICTIONS_CACHE_MAX_AGE, settings.PREDICTIONS_CACHE_STALE_WHILE_REVALIDATE)
+    return version, headers, etag_matches(request, etag)
+
+def flight_key(request: Request, version: int) -> tuple:
+    return (request.url.path, tuple(sorted(request.query_params.multi_items())), version)
+
+def parse_cursor(cursor: Optional[str] = None) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def next_cursor(posts: List[Dict], limit: int, now: datetime) -> Optional[str]:
+    # A short page means the ranking is exhausted
+    if len(posts) < limit:
+        return None
+    return encode_cursor(posts[-1]["virality_score"], posts[-1]["reddit_id"], now.timestamp())
 
 @router.get("/top")
-@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
-async def get_top_predictions(request: Request, limit: int = 10):
+@limiter.limit(tier_limit)
+async def get_top_predictions(
+    request: Request,
+    limit: int = Query(10, ge=1, le=settings.PREDICTIONS_MAX_LIMIT),
+    after: Optional[Cursor] = Depends(parse_cursor)
+):
+    version, headers, not_modified = await validate_cache(request)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    
     try:
         service = PredictionService()
-        predictions = await service.get_top_predictions(limit=limit)
-        return {
+        predictions, now = await flight.do(
+            flight_key(request, version),
+            lambda: service.get_top_predictions(limit=limit, after=after)
+        )
+        return FastJSONResponse({
             "success": True,
             "count": len(predictions),
-            "predictions": predictions
-        }
+            "predictions": predictions,
+            "next_cursor": next_cursor(predictions, limit, now)
+        }, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to fetch predictions")
 
 @router.get("/trending")
-@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
-async def get_trending(request: Request, hours: int = 24):
+@limiter.limit(tier_limit)
+async def get_trending(
+    request: Request,
+    hours: int = 24,
+    limit: int = Query(TRENDING_LIMIT, ge=1, le=settings.PREDICTIONS_MAX_LIMIT),
+    after: Optional[Cursor] = Depends(parse_cursor)
+):
+    version, headers, not_modified = await validate_cache(request)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    
     try:
         service = PredictionService()
-        trending = await service.get_trending(hours=hours)
-        return {
+        trending, now = await flight.do(
+            flight_key(request, version),
+            lambda: service.get_trending(hours=hours, limit=limit, after=after)
+        )
+        return FastJSONResponse({
             "success": True,
             "count": len(trending),
-            "trending": trending
-        }
+            "trending": trending,
+            "next_cursor": next_cursor(trending, limit, now)
+        }, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to fetch trending posts")
 
 @router.get("/subreddit/{subreddit}")
-@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
-async def get_subreddit_predictions(request: Request, subreddit: str, limit: int = 10):
+@limiter.limit(tier_limit)
+async def get_subreddit_predictions(
+    request: Request,
+    subreddit: str,
+    limit: int = Query(10, ge=1, le=settings.PREDICTIONS_MAX_LIMIT),
+    after: Optional[Cursor] = Depends(parse_cursor)
+):
+    version, headers, not_modified = await validate_cache(request)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    
     try:
         service = PredictionService()
-        predictions = await service.get_subreddit_predictions(subreddit=subreddit, limit=limit)
-        return {
+        predictions, now = await flight.do(
+            flight_key(request, version),
+            lambda: service.get_subreddit_predictions(subreddit=subreddit, limit=limit, after=after)
+        )
+        return FastJSONResponse({
             "success": True,
             "subreddit": subreddit,
             "count": len(predictions),
-            "predictions": predictions
-        }
+            "predictions": predictions,
+            "next_cursor": next_cursor(predictions, limit, now)
+        }, headers=headers)
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to fetch subreddit predictions")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch subreddit predictions")
+
+@router.get("/export")
+@limiter.limit(tier_limit)
+async def export_predictions(
+    request: Request,
+    hours: int = Query(24, ge=1),
+    subreddit: Optional[str] = None,
+    min_score: Optional[float] = None
+):
+    """
+    Stream every scored post in the window as NDJSON.
+    
+    Rows are written as each page is scored (in reddit_id order, unranked),
+    so the export never holds the whole window in memory.
+    """
+    service = PredictionService()
+    since = datetime.utcnow() - timedelta(hours=hours)
+    
+    async def stream():
+        try:
+            async for post in service.export(since, subreddit=subreddit, min_score=min_score, page_size=settings.PREDICTIONS_EXPORT_PAGE_SIZE):
+                yield orjson.dumps(post, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        except Exception as e:
+            # Headers are already sent; a trailing error line marks the export as incomplete
+            print(f"Error exporting predictions: {str(e)}")
+            yield orjson.dumps({"success": False, "error": "Export interrupted"}, option=orjson.OPT_APPEND_NEWLINE)
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,20 +1,50 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from app.services.reddit_service import RedditService
+from app.services.collection_queue import collection_queue
+from app.services.subreddit_scheduler import subreddit_scheduler
+from app.core.responses import FastJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
-@router.post("/collect")
-async def trigger_collection(background_tasks: BackgroundTasks):
+@router.post("/collect", status_code=202)
+async def trigger_collection():
     try:
-        service = RedditService()
-        background_tasks.add_task(service.collect_posts)
+        # Every registered subreddit, each at its learned depth
+        plan = await subreddit_scheduler.plan(due_only=False)
+        job, created = await collection_queue.enqueue(plan)
         return {
             "success": True,
-            "message": "Collection started in background"
+            "message": "Collection queued" if created else "Collection already in progress",
+            "job": job
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to start collection")
 
+@router.get("/jobs/{job_id}")
+async def get_collection_job(job_id: str):
+    try:
+        job = await collection_queue.get_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to get job")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "success": True,
+        "job": job
+    }
+
+@router.get("/schedule")
+async def get_collection_schedule():
+    try:
+        schedule = await subreddit_scheduler.schedule()
+        return {
+            "success": True,
+            "budget_requests_per_minute": subreddit_scheduler.budget,
+            "schedule": schedule
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to get schedule")
+
 @router.get("/status")
 async def get_collection_status():
     try:
@@ -0,0 +1,179 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.core.config import settings
+from app.core.metrics import cache_collector
+from app.core.singleflight import SingleFlight
+
+class BaseCache:
+    """
+    Async key/value cache with TTL, hit/miss counters and miss coalescing.
+    """
+    
+    def __init__(self, namespace: str, ttl: float, max_entries: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._flight = SingleFlight()
+        cache_collector.register(self)
+    
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+    
+    async def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+    
+    async def size(self) -> int:
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        pass
+    
+    async def lookup(self, key: str) -> Optional[Any]:
+        """
+        ``get`` that counts towards the hit/miss stats.
+        """
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return value
+    
+    async def get_or_set(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """
+        Return the cached value for ``key`` or compute, store and return it.
+        
+        Concurrent misses for the same key share a single factory call.
+        """
+        value = await self.lookup(key)
+        if value is not None:
+            return value
+        
+        async def compute():
+            value = await factory()
+            if should_cache(value):
+                await self.set(key, value)
+            return value
+        
+        return await self._flight.do(key, compute)
+    
+    async def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "coalesced": self._flight.shared,
+            "evictions": self.evictions,
+            "size": await self.size(),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl
+        }
+
+class MemoryCache(BaseCache):
+    """
+    In-process LRU cache; entries expire after ``ttl`` seconds.
+    """
+    backend = "memory"
+    
+    def __init__(self, namespace: str, ttl: float, max_entries: int):
+        super().__init__(namespace, ttl, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    async def size(self) -> int:
+        return len(self._entries)
+
+class RedisCache(BaseCache):
+    """
+    Redis-backed cache shared by every worker.
+    
+    Values are stored as JSON with a native TTL. A sorted set of access times
+    per namespace bounds the entry count with LRU eviction.
+    """
+    backend = "redis"
+    
+    def __init__(self, namespace: str, ttl: float, max_entries: int, url: str):
+        super().__init__(namespace, ttl, max_entries)
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._lru_key = f"cache:{namespace}:lru"
+    
+    def _key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+    
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self._redis.get(self._key(key))
+            if raw is None:
+                return None
+            await self._redis.zadd(self._lru_key, {key: time.time()})
+            return json.loads(raw)
+        except Exception as e:
+            print(f"Cache read error: {str(e)}")
+            return None
+    
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.set(self._key(key), json.dumps(value), ex=max(1, int(self.ttl)))
+                pipe.zadd(self._lru_key, {key: time.time()})
+                # Drop LRU entries whose values already expired
+                pipe.zremrangebyscore(self._lru_key, "-inf", time.time() - self.ttl)
+                pipe.zcard(self._lru_key)
+                results = await pipe.execute()
+            
+            overflow = results[-1] - self.max_entries
+            if overflow > 0:
+                evicted = await self._redis.zpopmin(self._lru_key, overflow)
+                if evicted:
+                    await self._redis.delete(*(self._key(member) for member, _ in evicted))
+                    self.evictions += len(evicted)
+        except Exception as e:
+            print(f"Cache write error: {str(e)}")
+    
+    async def size(self) -> int:
+        try:
+            return await self._redis.zcard(self._lru_key)
+        except Exception:
+            return 0
+    
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+def create_cache(namespace: str, ttl: float, max_entries: int) -> BaseCache:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(namespace, ttl, max_entries, settings.REDIS_URL)
+    return MemoryCache(namespace, ttl, max_entries)
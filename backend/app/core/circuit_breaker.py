@@ -0,0 +1,103 @@
+import time
+from typing import Dict, Optional
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing.
+    
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    ``allow`` refuses calls for ``reset_seconds``. Then it is half-open: one
+    probe call goes through, and its outcome closes the circuit or opens it
+    again. A probe that never reports back (e.g. cancelled) is replaced after
+    another ``reset_seconds``.
+    
+    Usage:
+        if not breaker.allow():
+            raise CircuitOpenError(...)
+        try:
+            result = await call()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_total = 0
+        self.rejected_total = 0
+        self.opened_at: Optional[float] = None
+        self._opened_monotonic = 0.0
+        self._probe_started: Optional[float] = None
+        self._state = self.CLOSED
+    
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_monotonic >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_started = None
+        return self._state
+    
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            now = time.monotonic()
+            if self._probe_started is None or now - self._probe_started >= self.reset_seconds:
+                self._probe_started = now
+                return True
+        self.rejected_total += 1
+        return False
+    
+    def record_success(self) -> None:
+        if self._state != self.CLOSED:
+            print(f"Circuit breaker {self.name} closed")
+        self._state = self.CLOSED
+        self.failures = 0
+        self._probe_started = None
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == self.HALF_OPEN or (self._state == self.CLOSED and self.failures >= self.failure_threshold):
+            self._open()
+    
+    def release(self) -> None:
+        """
+        The call ended without telling anything about the upstream; let another probe through.
+        """
+        self._probe_started = None
+    
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_monotonic = time.monotonic()
+        self._probe_started = None
+        self.opened_at = time.time()
+        self.opened_total += 1
+        print(f"Circuit breaker {self.name} opened after {self.failures} consecutive failures")
+    
+    def snapshot(self) -> Dict:
+        state = self.state
+        retry_in = None
+        if state == self.OPEN:
+            retry_in = round(max(self.reset_seconds - (time.monotonic() - self._opened_monotonic), 0.0), 1)
+        return {
+            "name": self.name,
+            "state": state,
+            "consecutive_failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_seconds": self.reset_seconds,
+            "opened_at": self.opened_at,
+            "retry_in_seconds": retry_in,
+            "opened_total": self.opened_total,
+            "rejected_total": self.rejected_total
+        }
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 import json
 
 class Settings(BaseSettings):
@@ -10,10 +10,50 @@ class Settings(BaseSettings):
     REDDIT_CLIENT_ID: str
     REDDIT_CLIENT_SECRET: str
     REDDIT_USER_AGENT: str = "MemeMarket/1.0"
+    REDDIT_URL: str = "https://www.reddit.com"
+    REDDIT_OAUTH_URL: str = "https://oauth.reddit.com"
+    REDDIT_REQUESTS_PER_MINUTE: int = 100
+    REDDIT_REQUEST_BURST: int = 10
+    REDDIT_COLLECT_CONCURRENCY: int = 4
+    
+    COLLECT_SUBREDDITS: List[str] = [
+        "technology",
+        "memes",
+        "funny",
+        "videos",
+        "gaming",
+        "worldnews",
+        "news",
+        "AskReddit",
+        "todayilearned",
+        "science"
+    ]
+    COLLECT_SUBREDDIT_LIMITS: Dict[str, int] = {}
+    COLLECT_POSTS_PER_SUBREDDIT: int = 50
+    COLLECT_MIN_LIMIT: int = 25
+    COLLECT_MAX_LIMIT: int = 200
+    COLLECT_SCHEDULE_ENABLED: bool = False
+    COLLECT_SCHEDULE_SECONDS: float = 30.0
+    COLLECT_REQUEST_BUDGET: float = 30.0
+    COLLECT_MIN_INTERVAL_SECONDS: float = 60.0
+    COLLECT_MAX_INTERVAL_SECONDS: float = 1800.0
+    COLLECT_RATE_SMOOTHING: float = 0.3
+    
+    COLLECT_QUEUE_BACKEND: str = "memory"
+    COLLECT_WORKER_CONCURRENCY: int = 4
+    COLLECT_LEASE_SECONDS: float = 120.0
+    COLLECT_MAX_ATTEMPTS: int = 3
+    COLLECT_RETRY_SECONDS: float = 10.0
+    COLLECT_POLL_SECONDS: float = 1.0
+    COLLECT_DRAIN_SECONDS: float = 30.0
+    COLLECT_JOB_TTL_SECONDS: int = 86400
     
     SUPABASE_URL: str
     SUPABASE_KEY: str
     SUPABASE_SERVICE_KEY: str
+    POSTGREST_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 20
+    DB_QUERY_TIMEOUT: float = 10.0
     
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -21,9 +61,74 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
     
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_TIERS: Dict[str, int] = {"pro": 600, "enterprise": 3000}
+    RATE_LIMIT_API_KEYS: Dict[str, str] = {}
     
     REDIS_URL: str = "redis://localhost:6379"
     
+    METRICS_ENABLED: bool = True
+    METRICS_LOOP_LAG_INTERVAL: float = 0.5
+    
+    POSTS_UPSERT_BATCH_SIZE: int = 200
+    POSTS_UPSERT_FLUSH_SECONDS: float = 2.0
+    POSTS_UPSERT_MAX_RETRIES: int = 3
+    
+    CHANGE_MIN_SCORE_DELTA: int = 10
+    CHANGE_MIN_SCORE_PCT: float = 0.02
+    CHANGE_MIN_COMMENT_DELTA: int = 3
+    CHANGE_MIN_RATIO_DELTA: float = 0.01
+    CHANGE_INDEX_TTL_HOURS: int = 24
+    
+    SNAPSHOT_VELOCITY_ENABLED: bool = True
+    SNAPSHOT_VELOCITY_WINDOW_MINUTES: int = 30
+    SNAPSHOT_DOWNSAMPLE_AFTER_HOURS: int = 6
+    SNAPSHOT_DOWNSAMPLE_BUCKET_MINUTES: int = 30
+    SNAPSHOT_RETENTION_DAYS: int = 7
+    
+    LEADERBOARD_SIZE: int = 200
+    LEADERBOARD_MAX_POSTS: int = 5000
+    LEADERBOARD_TTL_SECONDS: int = 86400
+    
+    PREDICTIONS_CACHE_MAX_AGE: int = 15
+    PREDICTIONS_CACHE_STALE_WHILE_REVALIDATE: int = 60
+    PREDICTIONS_MAX_LIMIT: int = 100
+    PREDICTIONS_EXPORT_PAGE_SIZE: int = 500
+    
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 30.0
+    
+    CACHE_BACKEND: str = "memory"
+    ANALYSIS_CACHE_TTL_SECONDS: int = 300
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 1000
+    ANALYSIS_CACHE_AGE_BUCKET_HOURS: float = 1.0
+    
+    PERPLEXITY_BASE_URL: str = "https://api.perplexity.ai/chat/completions"
+    PERPLEXITY_MAX_RETRIES: int = 3
+    PERPLEXITY_RETRY_BACKOFF: float = 0.5
+    PERPLEXITY_RETRY_MAX_DELAY: float = 30.0
+    PERPLEXITY_BATCH_CONCURRENCY: int = 8
+    PERPLEXITY_BATCH_MAX_ITEMS: int = 200
+    PERPLEXITY_PACK_SIZE: int = 10
+    PERPLEXITY_PACK_MAX_SIZE: int = 25
+    PERPLEXITY_PACK_MAX_TOKENS: int = 8000
+    PERPLEXITY_PACK_OUTPUT_TOKENS: int = 150
+    PERPLEXITY_DEADLINE_SECONDS: float = 15.0
+    PERPLEXITY_DEADLINE_MIN_SECONDS: float = 1.0
+    PERPLEXITY_DEADLINE_MAX_SECONDS: float = 120.0
+    PERPLEXITY_BREAKER_FAILURES: int = 5
+    PERPLEXITY_BREAKER_RESET_SECONDS: float = 30.0
+    PERPLEXITY_BREAKER_FALLBACK: bool = True
+    PERPLEXITY_HEDGE_ENABLED: bool = False
+    PERPLEXITY_HEDGE_PERCENTILE: float = 95.0
+    PERPLEXITY_HEDGE_MIN_SAMPLES: int = 20
+    PERPLEXITY_HEDGE_MAX_RATIO: float = 0.1
+    TRENDING_REFRESH_SECONDS: float = 300.0
+    TRENDING_RETRY_SECONDS: float = 30.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,5 +1,58 @@
-from supabase import create_client, Client
+import asyncio
+from typing import Optional, Union
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from app.core.config import settings
+from app.core.metrics import timed
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-supabase_admin: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
\ No newline at end of file
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """
+    Async PostgREST client whose session uses the configured connection pool.
+    """
+    
+    def create_session(self, base_url: str, headers: dict, timeout: Union[int, float, httpx.Timeout]) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            http2=settings.HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=settings.DB_POOL_SIZE,
+                max_keepalive_connections=settings.DB_POOL_SIZE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+
+_db: Optional[PooledPostgrestClient] = None
+
+def get_db() -> PooledPostgrestClient:
+    """
+    Shared async database client, created on first use.
+    """
+    global _db
+    if _db is None:
+        rest_url = settings.POSTGREST_URL or f"{settings.SUPABASE_URL}/rest/v1"
+        _db = PooledPostgrestClient(
+            rest_url,
+            headers={
+                **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                "apiKey": settings.SUPABASE_SERVICE_KEY,
+                "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}"
+            },
+            timeout=settings.DB_QUERY_TIMEOUT
+        )
+    return _db
+
+async def close_db() -> None:
+    global _db
+    if _db is not None:
+        await _db.aclose()
+        _db = None
+
+@timed("supabase", "query")
+async def execute(query, timeout: Optional[float] = None):
+    """
+    Run a PostgREST query builder, failing with TimeoutError after ``timeout`` seconds.
+    """
+    return await asyncio.wait_for(query.execute(), timeout or settings.DB_QUERY_TIMEOUT)
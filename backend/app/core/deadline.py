@@ -0,0 +1,54 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# Absolute time.monotonic() by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+class DeadlineExceeded(Exception):
+    pass
+
+def set_deadline(seconds: float) -> None:
+    """
+    Give the current request (and every task it starts) ``seconds`` to finish.
+    
+    A deadline can only be tightened: an outer, earlier deadline wins.
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is None or deadline < current:
+        _deadline.set(deadline)
+
+def override(seconds: Optional[float]) -> None:
+    """
+    Replace the deadline with ``seconds`` from now (None clears it).
+    
+    Only for work shared by several requests, run in its own task, where no
+    single caller's deadline should apply.
+    """
+    _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the deadline, or None when there is no deadline.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def check() -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+def timeout_for(default: float) -> float:
+    """
+    ``default``, shortened to whatever is left of the deadline.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return min(default, left)
@@ -0,0 +1,86 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class Hedger:
+    """
+    Sends a second copy of a slow call and takes whichever answers first.
+    
+    The hedge fires once the first call has run longer than the
+    ``percentile`` latency of the last ``window`` successful calls, so only
+    the slow tail is duplicated. No hedging happens before ``min_samples``
+    latencies are known, or once hedges exceed ``max_ratio`` of calls, which
+    keeps a struggling upstream from seeing double load.
+    """
+    
+    def __init__(self, name: str, percentile: float, min_samples: int, max_ratio: float, window: int = 200):
+        self.name = name
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies = deque(maxlen=window)
+    
+    def observe(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+    
+    def delay(self) -> Optional[float]:
+        """
+        How long to wait before hedging, or None while there are too few samples.
+        """
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        rank = math.ceil(self.percentile / 100 * len(ordered)) - 1
+        return ordered[min(max(rank, 0), len(ordered) - 1)]
+    
+    async def run(self, call: Callable[[], Awaitable[Any]], succeeded: Callable[[Any], bool] = lambda result: True) -> Any:
+        """
+        Await ``call()``, hedged when it is slow.
+        
+        A result failing ``succeeded`` (or an exception) only wins when the
+        other copy does no better. The losing copy is cancelled.
+        """
+        self.calls += 1
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(call())]
+        try:
+            delay = self.delay()
+            if delay is not None and self.hedged < self.max_ratio * self.calls:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.hedged += 1
+                    tasks.append(asyncio.ensure_future(call()))
+            
+            pending = set(tasks)
+            fallback = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=tasks.index):
+                    if task.exception() is None and succeeded(task.result()):
+                        self.observe(time.monotonic() - start)
+                        if task is not tasks[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    if fallback is None:
+                        fallback = task
+            return fallback.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def stats(self) -> Dict:
+        delay = self.delay()
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "samples": len(self._latencies),
+            "hedge_after_seconds": round(delay, 3) if delay is not None else None
+        }
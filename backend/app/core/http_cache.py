@@ -0,0 +1,37 @@
+import hashlib
+from typing import Dict, Optional
+from fastapi import Request
+
+def make_etag(version: int, request: Request) -> Optional[str]:
+    """
+    Strong ETag for a response derived from dataset ``version`` and the request.
+    
+    Returns None while no dataset version has been published, since there is
+    nothing stable to validate against.
+    """
+    if not version:
+        return None
+    
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{version}|{request.url.path}|{params}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    if etag is None:
+        return False
+    
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so W/ validators still match
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def cache_headers(etag: Optional[str], max_age: int, stale_while_revalidate: int) -> Dict[str, str]:
+    headers = {
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+    }
+    if etag is not None:
+        headers["ETag"] = etag
+    return headers
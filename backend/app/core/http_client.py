@@ -0,0 +1,21 @@
+import httpx
+from app.core.config import settings
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the app-lifetime outbound HTTP client.
+    
+    One pooled client is shared by every request so upstream connections
+    (and their TLS sessions) are reused instead of re-established per call.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+    
+    return httpx.AsyncClient(
+        http2=settings.HTTP2_ENABLED,
+        limits=limits,
+        timeout=settings.HTTP_TIMEOUT
+    )
@@ -0,0 +1,126 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+class JSONFieldStream:
+    """
+    Incremental parser for the first JSON object in streamed text.
+    
+    Feed it text as it arrives. Each top-level field is returned as
+    ``(key, value)`` as soon as its value is complete, so early fields of a
+    completion are usable before the rest has been generated. Text before the
+    opening brace (prose, a code fence) is skipped. Once the object closes,
+    ``done`` is set and ``text`` holds the whole object.
+    
+    Usage:
+        stream = JSONFieldStream()
+        for chunk in chunks:
+            for key, value in stream.feed(chunk):
+                ...
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._started = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect = "key"
+        self._start: Optional[int] = None
+        self._key: Optional[str] = None
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self.done:
+            return []
+        
+        if not self._started:
+            brace = chunk.find("{")
+            if brace < 0:
+                return []
+            chunk = chunk[brace:]
+            self._started = True
+        
+        self.text += chunk
+        fields = []
+        text = self.text
+        
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            char = text[i]
+            self._pos += 1
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._end_string(i, fields)
+                continue
+            
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect in ("key", "value"):
+                    self._start = i
+                    if self._expect == "value":
+                        self._expect = "string"
+                continue
+            
+            if char in "{[":
+                self._depth += 1
+                if self._depth == 2 and self._expect == "value":
+                    self._start = i
+                    self._expect = "nested"
+                continue
+            
+            if char in "}]":
+                if self._depth == 1 and self._expect == "scalar":
+                    self._emit(text[self._start:i], fields)
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "nested":
+                    self._emit(text[self._start:i + 1], fields)
+                elif self._depth == 0:
+                    self.text = text[:i + 1]
+                    self.done = True
+                continue
+            
+            if self._depth != 1:
+                continue
+            
+            if char == ":" and self._expect == "colon":
+                self._expect = "value"
+            elif char == ",":
+                if self._expect == "scalar":
+                    self._emit(text[self._start:i], fields)
+                self._expect = "key"
+            elif self._expect == "value" and char not in _WHITESPACE:
+                self._start = i
+                self._expect = "scalar"
+        
+        return fields
+    
+    def _end_string(self, i: int, fields: List[Tuple[str, Any]]) -> None:
+        raw = self.text[self._start:i + 1]
+        if self._expect == "key":
+            try:
+                self._key = json.loads(raw)
+            except ValueError:
+                self._key = None
+            self._expect = "colon"
+        elif self._expect == "string":
+            self._emit(raw, fields)
+    
+    def _emit(self, raw: str, fields: List[Tuple[str, Any]]) -> None:
+        self._expect = "comma"
+        if self._key is None:
+            return
+        try:
+            fields.append((self._key, json.loads(raw)))
+        except ValueError:
+            # Not valid JSON (e.g. a literal "true/false"); the final parse decides
+            pass
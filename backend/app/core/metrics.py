@@ -0,0 +1,213 @@
+import asyncio
+import functools
+import time
+import weakref
+from typing import Callable, Optional
+from app.core.config import settings
+
+# Exposition format served at /metrics
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Sub-millisecond buckets so scoring and cache-backed calls are visible
+OPERATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# prometheus_client is only imported (and the metrics registered) when enabled
+if settings.METRICS_ENABLED:
+    from prometheus_client import Counter, Gauge, Histogram
+    
+    REQUEST_SECONDS = Histogram(
+        "meme_market_http_request_duration_seconds",
+        "HTTP request latency by route",
+        ["method", "route", "status"],
+        buckets=OPERATION_BUCKETS
+    )
+    OPERATION_SECONDS = Histogram(
+        "meme_market_operation_duration_seconds",
+        "Time spent in instrumented service methods and upstream calls",
+        ["component", "operation"],
+        buckets=OPERATION_BUCKETS
+    )
+    POSTS_COLLECTED = Counter(
+        "meme_market_reddit_posts_collected_total",
+        "Posts fetched from Reddit",
+        ["subreddit"]
+    )
+    COLLECT_RATE = Gauge(
+        "meme_market_reddit_collect_posts_per_second",
+        "Fetch throughput of the most recent collection",
+        ["subreddit"]
+    )
+    EVENT_LOOP_LAG = Gauge(
+        "meme_market_event_loop_lag_seconds",
+        "How late the most recent event loop probe woke up"
+    )
+    EVENT_LOOP_LAG_SECONDS = Histogram(
+        "meme_market_event_loop_lag_seconds_distribution",
+        "Event loop probe wake-up delay",
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+    )
+
+def timed(component: str, operation: Optional[str] = None) -> Callable:
+    """
+    Record a function's duration in ``meme_market_operation_duration_seconds``.
+    
+    Works on sync and async functions. When metrics are disabled the function
+    is returned undecorated, so there is no per-call cost at all.
+    """
+    def decorator(func: Callable) -> Callable:
+        if not settings.METRICS_ENABLED:
+            return func
+        
+        histogram = OPERATION_SECONDS.labels(component, operation or func.__name__)
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    
+    return decorator
+
+def record_collected(subreddit: str, count: int, seconds: float) -> None:
+    if not settings.METRICS_ENABLED:
+        return
+    POSTS_COLLECTED.labels(subreddit).inc(count)
+    COLLECT_RATE.labels(subreddit).set(count / seconds if seconds > 0 else 0.0)
+
+class CacheCollector:
+    """
+    Exposes hit/miss counters of every live cache at scrape time.
+    
+    The caches already count lookups, so nothing extra runs on the hot path.
+    """
+    
+    def __init__(self):
+        self._caches = weakref.WeakSet()
+    
+    def register(self, cache) -> None:
+        if settings.METRICS_ENABLED:
+            self._caches.add(cache)
+    
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+        
+        hits = CounterMetricFamily("meme_market_cache_hits", "Cache hits", labels=["namespace", "backend"])
+        misses = CounterMetricFamily("meme_market_cache_misses", "Cache misses", labels=["namespace", "backend"])
+        ratio = GaugeMetricFamily("meme_market_cache_hit_ratio", "Cache hits / lookups", labels=["namespace", "backend"])
+        for cache in list(self._caches):
+            labels = [cache.namespace, cache.backend]
+            lookups = cache.hits + cache.misses
+            hits.add_metric(labels, cache.hits)
+            misses.add_metric(labels, cache.misses)
+            ratio.add_metric(labels, cache.hits / lookups if lookups else 0.0)
+        yield hits
+        yield misses
+        yield ratio
+
+class UpstreamCollector:
+    """
+    Exposes circuit breaker state and hedging counters of upstream clients at scrape time.
+    
+    Breaker state is 0 (closed), 1 (half-open) or 2 (open).
+    """
+    STATES = {"closed": 0, "half_open": 1, "open": 2}
+    
+    def __init__(self):
+        self._clients = []
+    
+    def register(self, breaker, hedger=None) -> None:
+        if settings.METRICS_ENABLED:
+            self._clients.append((breaker, hedger))
+    
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+        
+        state = GaugeMetricFamily("meme_market_circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", labels=["upstream"])
+        opened = CounterMetricFamily("meme_market_circuit_breaker_opened", "Times the circuit breaker opened", labels=["upstream"])
+        rejected = CounterMetricFamily("meme_market_circuit_breaker_rejected", "Calls refused while the circuit breaker was open", labels=["upstream"])
+        hedged = CounterMetricFamily("meme_market_upstream_hedged", "Hedge requests sent", labels=["upstream"])
+        hedge_wins = CounterMetricFamily("meme_market_upstream_hedge_wins", "Hedge requests that answered first", labels=["upstream"])
+        for breaker, hedger in self._clients:
+            state.add_metric([breaker.name], self.STATES[breaker.state])
+            opened.add_metric([breaker.name], breaker.opened_total)
+            rejected.add_metric([breaker.name], breaker.rejected_total)
+            if hedger is not None:
+                hedged.add_metric([hedger.name], hedger.hedged)
+                hedge_wins.add_metric([hedger.name], hedger.hedge_wins)
+        yield state
+        yield opened
+        yield rejected
+        yield hedged
+        yield hedge_wins
+
+cache_collector = CacheCollector()
+upstream_collector = UpstreamCollector()
+if settings.METRICS_ENABLED:
+    from prometheus_client import REGISTRY
+    REGISTRY.register(cache_collector)
+    REGISTRY.register(upstream_collector)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency.
+    
+    Routes are labelled by their path template (``/api/v1/predictions/subreddit/{subreddit}``)
+    so label cardinality stays bounded.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status)
+            ).observe(time.perf_counter() - start)
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """
+    Sleep ``interval`` in a loop and record how much later than asked each wake-up was.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - start - interval, 0.0)
+        EVENT_LOOP_LAG.set(lag)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+
+def render_metrics() -> bytes:
+    from prometheus_client import generate_latest
+    return generate_latest()
+
@@ -0,0 +1,42 @@
+import base64
+import json
+from typing import NamedTuple, Optional
+
+class Cursor(NamedTuple):
+    """
+    Keyset position in a ranking: the (virality_score, reddit_id) of the last row served.
+    
+    ``scored_at`` is the epoch time the ranking was scored at, so later pages
+    can be ranked with the same clock.
+    """
+    virality_score: float
+    reddit_id: str
+    scored_at: Optional[float] = None
+
+def encode_cursor(virality_score: float, reddit_id: str, scored_at: Optional[float] = None) -> str:
+    position = [virality_score, reddit_id] if scored_at is None else [virality_score, reddit_id, scored_at]
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Parse an opaque cursor issued by ``encode_cursor``.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        if not isinstance(position, list) or len(position) not in (2, 3):
+            raise ValueError("Invalid cursor")
+        scored_at = float(position[2]) if len(position) == 3 else None
+        return Cursor(float(position[0]), str(position[1]), scored_at)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def is_after(virality_score: float, reddit_id: str, cursor: Cursor) -> bool:
+    """
+    Whether a row sorts after ``cursor`` in (virality_score DESC, reddit_id ASC) order.
+    """
+    return virality_score < cursor.virality_score or (virality_score == cursor.virality_score and reddit_id > cursor.reddit_id)
@@ -0,0 +1,53 @@
+import hashlib
+from typing import Dict, Tuple
+from fastapi import Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from app.core.config import settings
+
+API_KEY_HEADER = "X-API-Key"
+
+# api key -> (tier, key digest); keys are never written to the limiter storage in clear
+_api_keys: Dict[str, Tuple[str, str]] = {
+    api_key: (tier, hashlib.sha256(api_key.encode()).hexdigest()[:16])
+    for api_key, tier in settings.RATE_LIMIT_API_KEYS.items()
+    if tier in settings.RATE_LIMIT_TIERS
+}
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Identify the client: a known API key counts against its tier, anyone else by IP.
+    """
+    known = _api_keys.get(request.headers.get(API_KEY_HEADER, ""))
+    if known is not None:
+        tier, digest = known
+        return f"{tier}:{digest}"
+    return f"ip:{get_remote_address(request)}"
+
+def tier_limit(key: str) -> str:
+    """
+    Per-minute limit for a ``rate_limit_key`` value.
+    """
+    tier = key.split(":", 1)[0]
+    return f"{settings.RATE_LIMIT_TIERS.get(tier, settings.RATE_LIMIT_PER_MINUTE)}/minute"
+
+def create_limiter() -> Limiter:
+    """
+    The limiter shared by every router.
+    
+    With the redis backend all workers count against the same moving-window
+    (sliding log) buckets, updated atomically by a Lua script in one round
+    trip. If Redis becomes unreachable, limits are enforced per process from
+    memory until it recovers.
+    """
+    storage_uri = settings.REDIS_URL if settings.RATE_LIMIT_BACKEND == "redis" else "memory://"
+    return Limiter(
+        key_func=rate_limit_key,
+        storage_uri=storage_uri,
+        strategy="moving-window",
+        key_prefix="ratelimit",
+        key_style="endpoint",
+        in_memory_fallback_enabled=True
+    )
+
+limiter = create_limiter()
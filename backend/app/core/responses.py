@@ -0,0 +1,28 @@
+from typing import Any
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _fallback(obj: Any) -> Any:
+    # Pydantic models and other types orjson does not know natively
+    return jsonable_encoder(obj)
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    
+    Datetimes and NumPy scalars/arrays are serialized natively. Returning an
+    instance directly from an endpoint also skips FastAPI's jsonable_encoder
+    pass, which matters for responses carrying hundreds of post dicts.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_fallback, option=ORJSON_OPTIONS)
+
+def sse_event(event: str, data: Any) -> bytes:
+    """
+    One Server-Sent Events frame with a JSON payload.
+    """
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, default=_fallback, option=ORJSON_OPTIONS) + b"\n\n"
\ No newline at end of file
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+class TokenBucket:
+    """
+    Async token bucket for pacing calls against an upstream quota.
+    
+    Tokens refill continuously at ``rate_per_minute``; up to ``capacity`` may
+    be spent in a burst. ``sync`` lets the caller feed back the quota the
+    upstream actually reports, so the bucket never runs ahead of it. It may
+    be called from executor threads: the bucket's fields are guarded by a
+    thread lock, never held across an await.
+    """
+    
+    def __init__(self, rate_per_minute: float, capacity: float):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self._state = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    async def acquire(self, tokens: float = 1) -> None:
+        async with self._lock:
+            while True:
+                with self._state:
+                    now = time.monotonic()
+                    if now < self._blocked_until:
+                        wait = self._blocked_until - now
+                    else:
+                        self._refill(now)
+                        if self.tokens >= tokens:
+                            self.tokens -= tokens
+                            return
+                        wait = (tokens - self.tokens) / self.rate
+                
+                await asyncio.sleep(wait)
+    
+    def sync(self, remaining: Optional[float], reset_in: Optional[float]) -> None:
+        """
+        Clamp the bucket to the upstream's reported remaining quota.
+        
+        When the upstream reports the window as exhausted, acquisitions wait
+        until it resets.
+        """
+        if remaining is None:
+            return
+        
+        with self._state:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, remaining)
+            
+            if remaining < 1 and reset_in:
+                self._blocked_until = max(self._blocked_until, now + reset_in)
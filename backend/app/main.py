@@ -1,18 +1,66 @@
-from fastapi import FastAPI
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
+from app.core.rate_limit import limiter
+from app.core.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, monitor_event_loop_lag, render_metrics
+from app.core.http_client import create_http_client
+from app.core.cache import create_cache
+from app.core.database import close_db
+from app.services.change_detector import change_detector
+from app.services.collection_queue import collection_queue
+from app.services.collection_worker import CollectionWorker
+from app.services.subreddit_scheduler import subreddit_scheduler
+from app.services.leaderboard_store import leaderboard_store
+from app.services.trending_refresher import TrendingRefresher
 from app.api.v1.router import api_router
 
-limiter = Limiter(key_func=get_remote_address)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.http_client = create_http_client()
+    app.state.analysis_cache = create_cache(
+        "analysis",
+        ttl=settings.ANALYSIS_CACHE_TTL_SECONDS,
+        max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES
+    )
+    app.state.trending_refresher = TrendingRefresher(client=app.state.http_client)
+    if os.getenv("PERPLEXITY_API_KEY"):
+        app.state.trending_refresher.start()
+    # With the memory queue nobody else can run collection jobs, so this process does
+    collector = CollectionWorker(collection_queue, subreddit_scheduler) if collection_queue.backend == "memory" else None
+    if collector is not None:
+        collector.start()
+        if settings.COLLECT_SCHEDULE_ENABLED:
+            subreddit_scheduler.start()
+    warm_task = asyncio.create_task(change_detector.warm(hours=settings.CHANGE_INDEX_TTL_HOURS))
+    lag_task = asyncio.create_task(monitor_event_loop_lag(settings.METRICS_LOOP_LAG_INTERVAL)) if settings.METRICS_ENABLED else None
+    try:
+        yield
+    finally:
+        warm_task.cancel()
+        if collector is not None:
+            await subreddit_scheduler.stop()
+            await collector.stop()
+        if lag_task is not None:
+            lag_task.cancel()
+        await app.state.trending_refresher.stop()
+        await leaderboard_store.close()
+        await close_db()
+        await collection_queue.close()
+        await subreddit_scheduler.stats.close()
+        await app.state.analysis_cache.close()
+        await app.state.http_client.aclose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url=f"{settings.API_V1_PREFIX}/docs",
+    lifespan=lifespan,
 )
 
 app.state.limiter = limiter
@@ -27,6 +75,9 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 @app.get("/")
@@ -39,4 +90,9 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
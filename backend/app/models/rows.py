@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List
+import numpy as np
+
+# Columns the scoring pass needs; subreddit is kept for per-subreddit boards
+SCORING_COLUMNS = "reddit_id,subreddit,created_utc,score,num_comments,upvote_ratio"
+
+# Columns returned to API clients for each ranked post
+POST_COLUMNS = "id,reddit_id,subreddit,title,url,author,score,upvote_ratio,num_comments,created_utc,is_video,is_self,permalink,collected_at"
+
+def _to_timestamp(value, default: float) -> float:
+    if not value:
+        return default
+    try:
+        created_time = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return default
+    if created_time.tzinfo is None:
+        created_time = created_time.replace(tzinfo=timezone.utc)
+    return created_time.timestamp()
+
+def parse_timestamps(values: List, default: float) -> np.ndarray:
+    """
+    Parse ISO timestamps to epoch seconds, treating naive values as UTC.
+    
+    Missing or unparseable values become ``default``.
+    """
+    try:
+        # Fast path: UTC ISO strings parse as one datetime64 column
+        utc_values = [v[:-6] if v.endswith("+00:00") else v.rstrip("Z") for v in values]
+        return np.array(utc_values, dtype="datetime64[us]").astype(np.int64) / 1e6
+    except (AttributeError, TypeError, ValueError):
+        return np.fromiter((_to_timestamp(v, default) for v in values), dtype=np.float64, count=len(values))
+
+@dataclass(slots=True)
+class PostColumns:
+    """
+    Columnar form of a posts result set, as consumed by the scoring pass.
+    
+    Built once from the lean SCORING_COLUMNS rows so scoring, ranking and
+    leaderboard grouping work on arrays instead of per-post dicts.
+    """
+    reddit_id: List[str]
+    subreddit: np.ndarray
+    created: np.ndarray
+    score: np.ndarray
+    num_comments: np.ndarray
+    upvote_ratio: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.reddit_id)
+    
+    @classmethod
+    def from_rows(cls, rows: List[Dict], now: float) -> "PostColumns":
+        count = len(rows)
+        return cls(
+            reddit_id=[row.get("reddit_id") for row in rows],
+            subreddit=np.array([row.get("subreddit") or "" for row in rows]),
+            created=parse_timestamps([row.get("created_utc") for row in rows], now),
+            score=np.fromiter((row.get("score") or 0 for row in rows), dtype=np.float64, count=count),
+            num_comments=np.fromiter((row.get("num_comments") or 0 for row in rows), dtype=np.float64, count=count),
+            upvote_ratio=np.fromiter((0.5 if row.get("upvote_ratio") is None else row["upvote_ratio"] for row in rows), dtype=np.float64, count=count)
+        )
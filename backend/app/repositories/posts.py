@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.core.database import execute, get_db
+
+# Keeps ``reddit_id=in.(...)`` filters well under URL length limits
+ID_CHUNK_SIZE = 200
+
+class PostRepository:
+    """
+    Queries against the ``posts`` table.
+    """
+    
+    def __init__(self, db=None):
+        self.db = db or get_db()
+    
+    async def recent_by_score(
+        self,
+        since: datetime,
+        limit: int,
+        offset: int = 0,
+        subreddit: Optional[str] = None,
+        columns: str = "*"
+    ) -> List[Dict]:
+        """
+        Posts created after ``since``, highest score first.
+        """
+        query = self.db.table("posts").select(columns).gte("created_utc", since.isoformat())
+        if subreddit is not None:
+            query = query.eq("subreddit", subreddit)
+        query = query.order("score", desc=True).order("reddit_id").range(offset, offset + limit - 1)
+        
+        return (await execute(query)).data
+    
+    async def top_by_score(
+        self,
+        since: datetime,
+        limit: int,
+        subreddit: Optional[str] = None,
+        columns: str = "*",
+        page_size: int = 1000
+    ) -> List[Dict]:
+        """
+        Up to ``limit`` rows of ``recent_by_score``, fetched in pages below PostgREST's max-rows cap.
+        """
+        rows = []
+        while len(rows) < limit:
+            page_limit = min(page_size, limit - len(rows))
+            page = await self.recent_by_score(since, page_limit, offset=len(rows), subreddit=subreddit, columns=columns)
+            rows.extend(page)
+            if len(page) < page_limit:
+                break
+        
+        return rows
+    
+    async def created_since(
+        self,
+        since: datetime,
+        columns: str,
+        limit: int,
+        after_id: Optional[str] = None,
+        subreddit: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Posts created after ``since`` in reddit_id order, resuming after ``after_id``.
+        
+        Keyset paging on the unique reddit_id keeps every page an index range
+        scan, however deep into the window it is.
+        """
+        query = self.db.table("posts").select(columns).gte("created_utc", since.isoformat())
+        if subreddit is not None:
+            query = query.eq("subreddit", subreddit)
+        if after_id is not None:
+            query = query.gt("reddit_id", after_id)
+        query = query.order("reddit_id").limit(limit)
+        
+        return (await execute(query)).data
+    
+    async def by_ids(self, reddit_ids: List[str], columns: str) -> List[Dict]:
+        """
+        Rows for ``reddit_ids`` (in no particular order), fetched in concurrent chunks.
+        """
+        chunks = [reddit_ids[start:start + ID_CHUNK_SIZE] for start in range(0, len(reddit_ids), ID_CHUNK_SIZE)]
+        results = await asyncio.gather(*(
+            execute(self.db.table("posts").select(columns).in_("reddit_id", chunk))
+            for chunk in chunks
+        ))
+        return [row for result in results for row in result.data]
+    
+    async def collected_since(self, since: datetime, columns: str, limit: int, offset: int = 0) -> List[Dict]:
+        query = self.db.table("posts").select(columns).gte("collected_at", since.isoformat()).order("reddit_id").range(offset, offset + limit - 1)
+        return (await execute(query)).data
+    
+    async def upsert(self, rows: List[Dict]) -> None:
+        await execute(self.db.table("posts").upsert(rows, on_conflict="reddit_id"))
+    
+    async def count(self) -> int:
+        """
+        Approximate row count.
+        
+        Uses PostgREST's estimated count (planner statistics for large tables,
+        exact below the max-rows threshold) and transfers a single id.
+        """
+        result = await execute(self.db.table("posts").select("id", count="estimated").limit(1))
+        return result.count or 0
+    
+    async def latest_collected_at(self) -> Optional[str]:
+        result = await execute(self.db.table("posts").select("collected_at").order("collected_at", desc=True).limit(1))
+        return result.data[0]["collected_at"] if result.data else None
+    
+    async def ping(self) -> None:
+        await execute(self.db.table("posts").select("id").limit(1))
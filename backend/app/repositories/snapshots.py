@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Dict, List
+from app.core.database import execute, get_db
+
+SNAPSHOT_COLUMNS = "reddit_id,ts,score,num_comments,upvote_ratio"
+
+class SnapshotRepository:
+    """
+    Queries against the append-only ``post_snapshots`` table.
+    """
+    
+    def __init__(self, db=None):
+        self.db = db or get_db()
+    
+    async def append(self, rows: List[Dict]) -> None:
+        await execute(self.db.table("post_snapshots").upsert(rows, on_conflict="reddit_id,ts"))
+    
+    async def series_rows(self, reddit_ids: List[str], since: datetime, limit: int, offset: int = 0) -> List[Dict]:
+        """
+        Snapshot rows for ``reddit_ids`` since ``since``, ordered by post then time.
+        """
+        query = self.db.table("post_snapshots").select(SNAPSHOT_COLUMNS).in_("reddit_id", reddit_ids).gte("ts", since.replace(tzinfo=None).isoformat()).order("reddit_id").order("ts").range(offset, offset + limit - 1)
+        return (await execute(query)).data
+    
+    async def downsample(self, older_than_hours: int, bucket_minutes: int, retention_days: int) -> None:
+        await execute(self.db.rpc("downsample_post_snapshots", {
+            "p_older_than_hours": older_than_hours,
+            "p_bucket_minutes": bucket_minutes,
+            "p_retention_days": retention_days
+        }))
@@ -0,0 +1,151 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from app.core.config import settings
+from app.repositories.posts import PostRepository
+
+class Fingerprint:
+    __slots__ = ("score", "num_comments", "upvote_ratio", "seen_at")
+    
+    def __init__(self, score: int, num_comments: int, upvote_ratio: float, seen_at: float):
+        self.score = score
+        self.num_comments = num_comments
+        self.upvote_ratio = upvote_ratio
+        self.seen_at = seen_at
+
+def snapshot(posts: List[Dict]) -> Dict[str, List]:
+    """
+    Compact ``[score, num_comments, upvote_ratio]`` of each polled post, by reddit_id.
+    """
+    return {
+        post["reddit_id"]: [post.get("score") or 0, post.get("num_comments") or 0, post.get("upvote_ratio") or 0]
+        for post in posts
+    }
+
+class ChangeDetector:
+    """
+    In-memory index of the last written metrics for each post.
+    
+    Sits between collection and the upsert: only posts that are new or whose
+    score, comment count or upvote ratio moved past the configured thresholds
+    are passed on. The index is updated with ``commit`` once rows are
+    actually written, so a failed chunk is retried on the next cycle.
+    """
+    
+    def __init__(
+        self,
+        min_score_delta: int,
+        min_score_pct: float,
+        min_comment_delta: int,
+        min_ratio_delta: float
+    ):
+        self.min_score_delta = min_score_delta
+        self.min_score_pct = min_score_pct
+        self.min_comment_delta = min_comment_delta
+        self.min_ratio_delta = min_ratio_delta
+        self._index: Dict[str, Fingerprint] = {}
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def _has_changed(self, previous: Fingerprint, score: int, num_comments: int, upvote_ratio: float) -> bool:
+        score_threshold = max(self.min_score_delta, abs(previous.score) * self.min_score_pct)
+        
+        return (
+            abs(score - previous.score) >= score_threshold or
+            abs(num_comments - previous.num_comments) >= self.min_comment_delta or
+            abs(upvote_ratio - previous.upvote_ratio) >= self.min_ratio_delta
+        )
+    
+    def changed(self, posts: List[Dict]) -> List[Dict]:
+        """
+        Filter ``posts`` down to the rows worth writing.
+        """
+        now = time.monotonic()
+        emitted = []
+        
+        for post in posts:
+            previous = self._index.get(post["reddit_id"])
+            if previous is None or self._has_changed(previous, post.get("score") or 0, post.get("num_comments") or 0, post.get("upvote_ratio") or 0):
+                emitted.append(post)
+            else:
+                previous.seen_at = now
+        
+        return emitted
+    
+    def count_changed(self, previous: Dict[str, List], current: Dict[str, List]) -> int:
+        """
+        How many posts of one ``snapshot`` are new or changed since an earlier one.
+        
+        Uses the same thresholds as ``changed`` but not the index, so any
+        process can diff two polls of a subreddit.
+        """
+        return sum(
+            1 for reddit_id, metrics in current.items()
+            if reddit_id not in previous or self._has_changed(Fingerprint(*previous[reddit_id], 0), *metrics)
+        )
+    
+    def commit(self, posts: List[Dict]) -> None:
+        """
+        Record ``posts`` as written.
+        """
+        now = time.monotonic()
+        for post in posts:
+            self._index[post["reddit_id"]] = Fingerprint(
+                post.get("score") or 0,
+                post.get("num_comments") or 0,
+                post.get("upvote_ratio") or 0,
+                now
+            )
+    
+    def prune(self, max_age_seconds: float) -> int:
+        """
+        Drop posts not seen for ``max_age_seconds`` (they fell out of the hot listings).
+        """
+        cutoff = time.monotonic() - max_age_seconds
+        stale = [reddit_id for reddit_id, fingerprint in self._index.items() if fingerprint.seen_at < cutoff]
+        for reddit_id in stale:
+            del self._index[reddit_id]
+        return len(stale)
+    
+    async def warm(self, hours: int = 24, page_size: int = 1000) -> int:
+        """
+        Load fingerprints of recently collected posts from the database.
+        
+        Entries already recorded by a collection that finished first are kept.
+        """
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        posts = PostRepository()
+        now = time.monotonic()
+        loaded = 0
+        offset = 0
+        
+        try:
+            while True:
+                rows = await posts.collected_since(cutoff_time, "reddit_id,score,num_comments,upvote_ratio", page_size, offset)
+                
+                for row in rows:
+                    if row["reddit_id"] not in self._index:
+                        self._index[row["reddit_id"]] = Fingerprint(
+                            row.get("score") or 0,
+                            row.get("num_comments") or 0,
+                            row.get("upvote_ratio") or 0,
+                            now
+                        )
+                        loaded += 1
+                
+                if len(rows) < page_size:
+                    break
+                offset += page_size
+        except Exception as e:
+            print(f"Error warming change index: {str(e)}")
+        
+        return loaded
+
+# One index per process, shared by every collection run
+change_detector = ChangeDetector(
+    min_score_delta=settings.CHANGE_MIN_SCORE_DELTA,
+    min_score_pct=settings.CHANGE_MIN_SCORE_PCT,
+    min_comment_delta=settings.CHANGE_MIN_COMMENT_DELTA,
+    min_ratio_delta=settings.CHANGE_MIN_RATIO_DELTA
+)
@@ -0,0 +1,423 @@
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+
+# Subreddit name of the unit that runs once every subreddit of a job is finished
+FINALIZE = "*"
+
+@dataclass(frozen=True, slots=True)
+class WorkUnit:
+    """
+    One leased piece of a collection job: a subreddit fetched ``limit`` posts
+    deep, or the job's finalize step.
+    """
+    job_id: str
+    subreddit: str
+    limit: int = 0
+    attempts: int = 1
+    
+    @property
+    def member(self) -> str:
+        return f"{self.job_id}|{self.subreddit}|{self.limit}"
+    
+    @property
+    def is_finalize(self) -> bool:
+        return self.subreddit == FINALIZE
+    
+    @classmethod
+    def parse(cls, member: str, attempts: int = 1) -> "WorkUnit":
+        job_id, subreddit, limit = member.split("|")
+        return cls(job_id=job_id, subreddit=subreddit, limit=int(limit), attempts=attempts)
+
+def new_job(subreddits: Dict[str, int]) -> Dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "status": "queued",
+        "subreddits": subreddits,
+        "units_total": len(subreddits),
+        "units_done": 0,
+        "units_failed": 0,
+        "posts_collected": 0,
+        "errors": {},
+        "created_at": datetime.utcnow().isoformat(),
+        "started_at": None,
+        "finished_at": None
+    }
+
+def with_progress(job: Dict) -> Dict:
+    finished = job["units_done"] + job["units_failed"]
+    return {**job, "progress": round(finished / job["units_total"], 4) if job["units_total"] else 1.0}
+
+class MemoryCollectionQueue:
+    """
+    Process-local job queue, worked by the collector embedded in the web process.
+    
+    Same semantics as the Redis queue (dedupe, leases, retries, progress), but
+    jobs are lost on restart and only this process can run them.
+    """
+    backend = "memory"
+    
+    def __init__(self, lease_seconds: float, max_attempts: int, retry_seconds: float):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self._jobs: Dict[str, Dict] = {}
+        self._units: Dict[str, float] = {}
+        self._attempts: Dict[str, int] = {}
+        self._active: Optional[str] = None
+        self._latest: Optional[str] = None
+        self._last_completed: Optional[str] = None
+    
+    async def enqueue(self, subreddits: Dict[str, int]) -> Tuple[Dict, bool]:
+        """
+        Queue a collection of ``subreddits`` (name to listing depth), or return
+        the job already in progress.
+        
+        Returns ``(job, created)``.
+        """
+        if not subreddits:
+            raise ValueError("No subreddits to collect")
+        
+        active = self._jobs.get(self._active) if self._active else None
+        if active is not None:
+            return with_progress(active), False
+        
+        job = new_job(subreddits)
+        self._jobs[job["id"]] = job
+        self._active = self._latest = job["id"]
+        now = time.time()
+        for subreddit, limit in subreddits.items():
+            self._units[WorkUnit(job["id"], subreddit, limit).member] = now
+        return with_progress(job), True
+    
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        return with_progress(job) if job is not None else None
+    
+    async def latest_job(self) -> Optional[Dict]:
+        return await self.get_job(self._latest) if self._latest else None
+    
+    async def last_completed_job(self) -> Optional[Dict]:
+        return await self.get_job(self._last_completed) if self._last_completed else None
+    
+    async def claim(self) -> Optional[WorkUnit]:
+        """
+        Lease the oldest visible unit for ``lease_seconds``.
+        """
+        now = time.time()
+        visible = [(visible_at, member) for member, visible_at in self._units.items() if visible_at <= now]
+        if not visible:
+            return None
+        
+        _, member = min(visible)
+        self._units[member] = now + self.lease_seconds
+        self._attempts[member] = self._attempts.get(member, 0) + 1
+        unit = WorkUnit.parse(member, self._attempts[member])
+        
+        job = self._jobs.get(unit.job_id)
+        if job is not None and not unit.is_finalize:
+            job["status"] = "running"
+            job["started_at"] = job["started_at"] or datetime.utcnow().isoformat()
+        return unit
+    
+    async def renew(self, unit: WorkUnit) -> None:
+        if unit.member in self._units:
+            self._units[unit.member] = time.time() + self.lease_seconds
+    
+    async def complete(self, unit: WorkUnit, posts: int = 0) -> None:
+        if self._units.pop(unit.member, None) is None:
+            # The lease expired and another worker already finished this unit
+            return
+        self._attempts.pop(unit.member, None)
+        
+        job = self._jobs.get(unit.job_id)
+        if job is None:
+            return
+        if unit.is_finalize:
+            self._close(job, "completed")
+            return
+        
+        job["units_done"] += 1
+        job["posts_collected"] += posts
+        self._maybe_finalize(job)
+    
+    async def fail(self, unit: WorkUnit, error: str) -> None:
+        if unit.member not in self._units:
+            return
+        if unit.attempts < self.max_attempts:
+            self._units[unit.member] = time.time() + self.retry_seconds * unit.attempts
+            return
+        
+        del self._units[unit.member]
+        self._attempts.pop(unit.member, None)
+        
+        job = self._jobs.get(unit.job_id)
+        if job is None:
+            return
+        if unit.is_finalize:
+            job["errors"][FINALIZE] = error
+            self._close(job, "failed")
+            return
+        
+        job["units_failed"] += 1
+        job["errors"][unit.subreddit] = error
+        self._maybe_finalize(job)
+    
+    def _maybe_finalize(self, job: Dict) -> None:
+        if job["units_done"] + job["units_failed"] == job["units_total"]:
+            job["status"] = "finalizing"
+            self._units[WorkUnit(job["id"], FINALIZE).member] = time.time()
+    
+    def _close(self, job: Dict, status: str) -> None:
+        job["status"] = status
+        job["finished_at"] = datetime.utcnow().isoformat()
+        if status == "completed":
+            self._last_completed = job["id"]
+        if self._active == job["id"]:
+            self._active = None
+    
+    async def stats(self) -> Dict:
+        now = time.time()
+        pending = sum(1 for visible_at in self._units.values() if visible_at <= now)
+        return {"backend": self.backend, "units_pending": pending, "units_leased": len(self._units) - pending}
+    
+    async def close(self) -> None:
+        pass
+
+class RedisCollectionQueue:
+    """
+    Collection jobs shared by every web and collector process through Redis.
+    
+    Each subreddit of a job is a unit in the ``collect:units`` sorted set,
+    scored by the time it becomes visible. Claiming a unit pushes its score
+    out by ``lease_seconds``. Workers renew the lease while they run the unit.
+    If a worker dies, the lease lapses and another worker picks the unit up
+    again. No reaper is needed. Removing the unit on completion is the
+    commit point, so each unit is counted once even if two workers ran it.
+    The worker that finishes the last subreddit queues the job's finalize unit
+    (leaderboard refresh), which is leased and retried the same way.
+    """
+    backend = "redis"
+    
+    UNITS_KEY = "collect:units"
+    ATTEMPTS_KEY = "collect:attempts"
+    ACTIVE_KEY = "collect:active"
+    LATEST_KEY = "collect:latest"
+    LAST_COMPLETED_KEY = "collect:last_completed"
+    
+    def __init__(self, url: str, lease_seconds: float, max_attempts: int, retry_seconds: float, job_ttl: int):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url, decode_responses=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.job_ttl = job_ttl
+    
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"collect:job:{job_id}"
+    
+    @staticmethod
+    def _errors_key(job_id: str) -> str:
+        return f"collect:job:{job_id}:errors"
+    
+    async def enqueue(self, subreddits: Dict[str, int]) -> Tuple[Dict, bool]:
+        """
+        Queue a collection of ``subreddits`` (name to listing depth), or return
+        the job already in progress.
+        
+        Returns ``(job, created)``.
+        """
+        if not subreddits:
+            raise ValueError("No subreddits to collect")
+        
+        from redis.exceptions import WatchError
+        
+        job = new_job(subreddits)
+        job_key = self._job_key(job["id"])
+        fields = {key: value for key, value in job.items() if key != "errors" and value is not None}
+        fields["subreddits"] = json.dumps(subreddits)
+        
+        # Written before the active pointer can name it, so a pointer without a job hash is always stale
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(job_key, mapping=fields)
+            pipe.expire(job_key, self.job_ttl)
+            await pipe.execute()
+        
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    # Retried if another enqueue or close moves the pointer in between
+                    await pipe.watch(self.ACTIVE_KEY)
+                    active_id = await pipe.get(self.ACTIVE_KEY)
+                    active = await self.get_job(active_id) if active_id else None
+                    if active is not None:
+                        await pipe.unwatch()
+                        await self._redis.delete(job_key)
+                        return active, False
+                    
+                    now = time.time()
+                    pipe.multi()
+                    pipe.set(self.ACTIVE_KEY, job["id"], ex=self.job_ttl)
+                    pipe.zadd(self.UNITS_KEY, {WorkUnit(job["id"], subreddit, limit).member: now for subreddit, limit in subreddits.items()})
+                    pipe.set(self.LATEST_KEY, job["id"], ex=self.job_ttl)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    continue
+        
+        return with_progress(job), True
+    
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._job_key(job_id))
+            pipe.hgetall(self._errors_key(job_id))
+            fields, errors = await pipe.execute()
+        if not fields:
+            return None
+        
+        job = new_job({})
+        job.update(fields)
+        job["subreddits"] = json.loads(fields["subreddits"])
+        for counter in ("units_total", "units_done", "units_failed", "posts_collected"):
+            job[counter] = int(job[counter])
+        job["errors"] = errors
+        job.pop("units_finished", None)
+        return with_progress(job)
+    
+    async def latest_job(self) -> Optional[Dict]:
+        job_id = await self._redis.get(self.LATEST_KEY)
+        return await self.get_job(job_id) if job_id else None
+    
+    async def last_completed_job(self) -> Optional[Dict]:
+        job_id = await self._redis.get(self.LAST_COMPLETED_KEY)
+        return await self.get_job(job_id) if job_id else None
+    
+    async def claim(self) -> Optional[WorkUnit]:
+        """
+        Lease the oldest visible unit for ``lease_seconds``.
+        """
+        from redis.exceptions import WatchError
+        
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    # Retried if another worker claims or renews in between
+                    await pipe.watch(self.UNITS_KEY)
+                    now = time.time()
+                    members = await pipe.zrangebyscore(self.UNITS_KEY, "-inf", now, start=0, num=1)
+                    if not members:
+                        await pipe.unwatch()
+                        return None
+                    
+                    member = members[0]
+                    pipe.multi()
+                    pipe.zadd(self.UNITS_KEY, {member: now + self.lease_seconds})
+                    pipe.hincrby(self.ATTEMPTS_KEY, member, 1)
+                    _, attempts = await pipe.execute()
+                    break
+                except WatchError:
+                    continue
+        
+        unit = WorkUnit.parse(member, attempts)
+        if not unit.is_finalize:
+            job_key = self._job_key(unit.job_id)
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hsetnx(job_key, "started_at", datetime.utcnow().isoformat())
+                pipe.hset(job_key, "status", "running")
+                await pipe.execute()
+        return unit
+    
+    async def renew(self, unit: WorkUnit) -> None:
+        await self._redis.zadd(self.UNITS_KEY, {unit.member: time.time() + self.lease_seconds}, xx=True)
+    
+    async def complete(self, unit: WorkUnit, posts: int = 0) -> None:
+        if not await self._redis.zrem(self.UNITS_KEY, unit.member):
+            # The lease expired and another worker already finished this unit
+            return
+        await self._redis.hdel(self.ATTEMPTS_KEY, unit.member)
+        
+        if unit.is_finalize:
+            await self._close(unit.job_id, "completed")
+            return
+        
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(self._job_key(unit.job_id), "units_done", 1)
+            pipe.hincrby(self._job_key(unit.job_id), "posts_collected", posts)
+            pipe.hincrby(self._job_key(unit.job_id), "units_finished", 1)
+            pipe.hget(self._job_key(unit.job_id), "units_total")
+            results = await pipe.execute()
+        await self._maybe_finalize(unit.job_id, results[-2], results[-1])
+    
+    async def fail(self, unit: WorkUnit, error: str) -> None:
+        if unit.attempts < self.max_attempts:
+            await self._redis.zadd(self.UNITS_KEY, {unit.member: time.time() + self.retry_seconds * unit.attempts}, xx=True)
+            return
+        
+        if not await self._redis.zrem(self.UNITS_KEY, unit.member):
+            return
+        await self._redis.hdel(self.ATTEMPTS_KEY, unit.member)
+        
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._errors_key(unit.job_id), unit.subreddit, error)
+            pipe.expire(self._errors_key(unit.job_id), self.job_ttl)
+            if not unit.is_finalize:
+                pipe.hincrby(self._job_key(unit.job_id), "units_failed", 1)
+                pipe.hincrby(self._job_key(unit.job_id), "units_finished", 1)
+                pipe.hget(self._job_key(unit.job_id), "units_total")
+            results = await pipe.execute()
+        
+        if unit.is_finalize:
+            await self._close(unit.job_id, "failed")
+        else:
+            await self._maybe_finalize(unit.job_id, results[-2], results[-1])
+    
+    async def _maybe_finalize(self, job_id: str, finished: int, total: Optional[str]) -> None:
+        # units_finished is incremented atomically, so exactly one worker sees it reach the total
+        if total is None or finished != int(total):
+            return
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job_id), "status", "finalizing")
+            pipe.zadd(self.UNITS_KEY, {WorkUnit(job_id, FINALIZE).member: time.time()})
+            await pipe.execute()
+    
+    async def _close(self, job_id: str, status: str) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._job_key(job_id), mapping={"status": status, "finished_at": datetime.utcnow().isoformat()})
+            if status == "completed":
+                pipe.set(self.LAST_COMPLETED_KEY, job_id, ex=self.job_ttl)
+            await pipe.execute()
+        if await self._redis.get(self.ACTIVE_KEY) == job_id:
+            await self._redis.delete(self.ACTIVE_KEY)
+    
+    async def stats(self) -> Dict:
+        now = time.time()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zcount(self.UNITS_KEY, "-inf", now)
+            pipe.zcount(self.UNITS_KEY, f"({now}", "+inf")
+            pending, leased = await pipe.execute()
+        return {"backend": self.backend, "units_pending": pending, "units_leased": leased}
+    
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+def create_collection_queue():
+    if settings.COLLECT_QUEUE_BACKEND == "redis":
+        return RedisCollectionQueue(
+            settings.REDIS_URL,
+            lease_seconds=settings.COLLECT_LEASE_SECONDS,
+            max_attempts=settings.COLLECT_MAX_ATTEMPTS,
+            retry_seconds=settings.COLLECT_RETRY_SECONDS,
+            job_ttl=settings.COLLECT_JOB_TTL_SECONDS
+        )
+    return MemoryCollectionQueue(
+        lease_seconds=settings.COLLECT_LEASE_SECONDS,
+        max_attempts=settings.COLLECT_MAX_ATTEMPTS,
+        retry_seconds=settings.COLLECT_RETRY_SECONDS
+    )
+
+collection_queue = create_collection_queue()
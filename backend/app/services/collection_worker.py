@@ -0,0 +1,124 @@
+import asyncio
+import os
+import socket
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.services.collection_queue import WorkUnit
+from app.services.reddit_service import RedditService
+from app.services.subreddit_scheduler import SubredditScheduler
+
+class CollectionWorker:
+    """
+    Claims units from the collection queue and runs them.
+    
+    ``concurrency`` units run at once. Each unit's lease is renewed while it
+    runs, so a slow subreddit is not handed to a second worker. Stopping
+    cancels in-flight units; their leases lapse and another worker retries them.
+    Finished polls are reported to ``scheduler`` so it can learn change rates.
+    """
+    
+    def __init__(
+        self,
+        queue,
+        scheduler: Optional[SubredditScheduler] = None,
+        concurrency: int = settings.COLLECT_WORKER_CONCURRENCY,
+        poll_interval: float = settings.COLLECT_POLL_SECONDS
+    ):
+        self.queue = queue
+        self.scheduler = scheduler
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.service = RedditService()
+        self.units_done = 0
+        self.units_failed = 0
+        self._stopping = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+    
+    async def _keep_leased(self, unit: WorkUnit) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            try:
+                await self.queue.renew(unit)
+            except Exception as e:
+                print(f"Lease renewal error ({unit.member}): {str(e)}")
+    
+    async def run_unit(self, unit: WorkUnit) -> None:
+        heartbeat = asyncio.create_task(self._keep_leased(unit))
+        try:
+            if unit.is_finalize:
+                await self.service.finish_collection()
+                await self.queue.complete(unit)
+            else:
+                result = await self.service.collect_subreddit(unit.subreddit, unit.limit or settings.COLLECT_POSTS_PER_SUBREDDIT)
+                await self.queue.complete(unit, result["fetched"])
+                if self.scheduler is not None:
+                    await self._learn(unit, result)
+            self.units_done += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.units_failed += 1
+            print(f"Collection unit {unit.member} failed (attempt {unit.attempts}): {str(e)}")
+            await self.queue.fail(unit, str(e))
+        finally:
+            heartbeat.cancel()
+    
+    async def _learn(self, unit: WorkUnit, result: Dict) -> None:
+        try:
+            await self.scheduler.record(unit.subreddit, result["listing"], unit.limit)
+        except Exception as e:
+            print(f"Error recording poll of r/{unit.subreddit}: {str(e)}")
+    
+    async def _wait(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                unit = await self.queue.claim()
+            except Exception as e:
+                print(f"Collection queue error: {str(e)}")
+                unit = None
+            
+            if unit is None:
+                await self._wait(self.poll_interval)
+                continue
+            
+            try:
+                await self.run_unit(unit)
+            except Exception as e:
+                # The queue itself failed; the unit's lease will lapse and it is retried
+                print(f"Collection queue error: {str(e)}")
+                await self._wait(self.poll_interval)
+    
+    def start(self) -> None:
+        if not self._tasks:
+            self._stopping.clear()
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+    
+    def request_stop(self) -> None:
+        self._stopping.set()
+    
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop claiming units, give in-flight ones ``timeout`` seconds to finish, then cancel them.
+        """
+        self._stopping.set()
+        if timeout:
+            await asyncio.wait(self._tasks, timeout=timeout)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def run(self, drain_timeout: Optional[float] = None) -> None:
+        """
+        Work the queue until ``request_stop`` is called.
+        """
+        self.start()
+        await self._stopping.wait()
+        await self.stop(drain_timeout)
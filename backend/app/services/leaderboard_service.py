@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.models.rows import SCORING_COLUMNS, PostColumns
+from app.repositories.posts import PostRepository
+from app.services.prediction_service import PredictionService, TRENDING_WINDOW_HOURS
+from app.services.leaderboard_store import leaderboard_store
+
+class LeaderboardService:
+    """
+    Rebuilds the ranked prediction leaderboards after each ingest.
+    
+    One lean query covers the widest window; every board is ranked from that
+    single scoring pass, only the ranked posts are fetched in full, and the
+    result is published as a new version so the prediction endpoints only
+    read prebuilt lists.
+    """
+    
+    def __init__(self):
+        self.prediction_service = PredictionService()
+        self.posts = PostRepository()
+        self.store = leaderboard_store
+    
+    async def refresh(self) -> int:
+        """
+        Recompute and publish every leaderboard.
+        
+        Returns:
+            The published version, or 0 when the refresh failed
+        """
+        try:
+            # One clock for the window, the scores and the published scoring time
+            now = datetime.now(timezone.utc)
+            cutoff_time = (now - timedelta(hours=TRENDING_WINDOW_HOURS)).replace(tzinfo=None)
+            rows = await self.posts.top_by_score(cutoff_time, settings.LEADERBOARD_MAX_POSTS, columns=SCORING_COLUMNS)
+            columns = PostColumns.from_rows(rows, now.timestamp())
+            kinematics = await self.prediction_service.load_kinematics(columns.reddit_id)
+            ranked = self.prediction_service.build_leaderboards(columns, settings.LEADERBOARD_SIZE, kinematics=kinematics, now=now)
+            
+            scores = {reddit_id: score for board in ranked.values() for reddit_id, score in board}
+            posts = {
+                post["reddit_id"]: post
+                for post in await self.prediction_service.hydrate(list(scores), list(scores.values()))
+            }
+            boards = {
+                name: [posts[reddit_id] for reddit_id, _ in board if reddit_id in posts]
+                for name, board in ranked.items()
+            }
+            
+            version = await self.store.publish(boards, scored_at=now.timestamp())
+            print(f"Published leaderboards v{version} ({len(rows)} posts, {len(boards)} boards)")
+            return version
+        except Exception as e:
+            print(f"Error refreshing leaderboards: {str(e)}")
+            return 0
@@ -0,0 +1,122 @@
+import json
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+
+# A read returns the board and the epoch time its scores were computed at (None if unknown)
+BoardRead = Tuple[List[Dict], Optional[float]]
+
+class MemoryLeaderboardStore:
+    """
+    Process-local leaderboards; only the worker that ran the collection sees them.
+    """
+    backend = "memory"
+    
+    def __init__(self):
+        self._version = 0
+        self._boards: Dict[str, List[Dict]] = {}
+        self._scored_at: Optional[float] = None
+    
+    async def publish(self, boards: Dict[str, List[Dict]], scored_at: Optional[float] = None) -> int:
+        # Swap the whole set at once so readers never see a mix of versions
+        self._boards = boards
+        self._scored_at = scored_at
+        self._version += 1
+        return self._version
+    
+    async def version(self) -> int:
+        return self._version
+    
+    async def read(self, name: str) -> Optional[BoardRead]:
+        if not self._version:
+            return None
+        return self._boards.get(name, []), self._scored_at
+    
+    async def close(self) -> None:
+        pass
+
+class RedisLeaderboardStore:
+    """
+    Leaderboards shared by every worker through Redis.
+    
+    Each publish writes its boards under a new version number and then
+    flips ``leaderboard:version``. Readers keep the decoded boards of the
+    current version in memory, so a read is one GET of the version counter.
+    Only boards the version actually has are kept, and they are dropped as
+    soon as a new version is seen.
+    """
+    backend = "redis"
+    
+    # Hash field holding the version's scoring time; board names never start with "@"
+    SCORED_AT_FIELD = "@scored_at"
+    
+    def __init__(self, url: str, ttl: int):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self._decoded_version = 0
+        self._decoded: Dict[str, List[Dict]] = {}
+        self._decoded_scored_at: Optional[float] = None
+    
+    async def publish(self, boards: Dict[str, List[Dict]], scored_at: Optional[float] = None) -> int:
+        version = await self._redis.incr("leaderboard:next_version")
+        mapping = {name: json.dumps(board) for name, board in boards.items()}
+        if scored_at is not None:
+            mapping[self.SCORED_AT_FIELD] = repr(scored_at)
+        
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"leaderboard:{version}", mapping=mapping or {"": "[]"})
+            pipe.expire(f"leaderboard:{version}", self.ttl)
+            pipe.set("leaderboard:version", version, ex=self.ttl)
+            await pipe.execute()
+        
+        return version
+    
+    async def version(self) -> int:
+        try:
+            return int(await self._redis.get("leaderboard:version") or 0)
+        except Exception as e:
+            print(f"Leaderboard read error: {str(e)}")
+            return 0
+    
+    async def read(self, name: str) -> Optional[BoardRead]:
+        version = await self.version()
+        if not version:
+            return None
+        
+        if version != self._decoded_version:
+            self._decoded = {}
+            self._decoded_version = version
+            self._decoded_scored_at = None
+        
+        cached = self._decoded.get(name)
+        if cached is not None:
+            return cached, self._decoded_scored_at
+        
+        try:
+            raw, raw_scored_at = await self._redis.hmget(f"leaderboard:{version}", [name, self.SCORED_AT_FIELD])
+        except Exception as e:
+            print(f"Leaderboard read error: {str(e)}")
+            return None
+        
+        scored_at = float(raw_scored_at) if raw_scored_at is not None else None
+        
+        # A subreddit missing from a published version simply has no recent posts.
+        # It is not cached: names come from request paths, so that would grow without bound
+        if raw is None:
+            return [], scored_at
+        
+        board = json.loads(raw)
+        if version == self._decoded_version:
+            self._decoded[name] = board
+            self._decoded_scored_at = scored_at
+        return board, scored_at
+    
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+def create_leaderboard_store():
+    if settings.CACHE_BACKEND == "redis":
+        return RedisLeaderboardStore(settings.REDIS_URL, settings.LEADERBOARD_TTL_SECONDS)
+    return MemoryLeaderboardStore()
+
+leaderboard_store = create_leaderboard_store()
@@ -1,14 +1,241 @@
 import os
+import math
+import json
+import random
+import asyncio
+import hashlib
 import httpx
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
+from app.core import deadline
+from app.core.cache import BaseCache
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.config import settings
+from app.core.hedging import Hedger
+from app.core.json_stream import JSONFieldStream
+from app.core.metrics import timed, upstream_collector
+from app.core.singleflight import SingleFlight
+
+# Trending topics are global, so concurrent requests share one LLM call
+trending_flight = SingleFlight()
+
+# Shared by every request in this process, so one slow or failing upstream is noticed once
+perplexity_breaker = CircuitBreaker(
+    "perplexity",
+    failure_threshold=settings.PERPLEXITY_BREAKER_FAILURES,
+    reset_seconds=settings.PERPLEXITY_BREAKER_RESET_SECONDS
+)
+perplexity_hedger = Hedger(
+    "perplexity",
+    percentile=settings.PERPLEXITY_HEDGE_PERCENTILE,
+    min_samples=settings.PERPLEXITY_HEDGE_MIN_SAMPLES,
+    max_ratio=settings.PERPLEXITY_HEDGE_MAX_RATIO
+)
+upstream_collector.register(perplexity_breaker, perplexity_hedger)
+
+def upstream_failed(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+def estimate_tokens(text: str) -> int:
+    # Rough count for English prompts; only used to size packs
+    return len(text) // 4 + 1
 
 class PerplexityService:
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, cache: Optional[BaseCache] = None):
         self.api_key = os.getenv("PERPLEXITY_API_KEY")
-        self.base_url = "https://api.perplexity.ai/chat/completions"
+        self.base_url = settings.PERPLEXITY_BASE_URL
         self.model = "llama-3.1-sonar-small-128k-online"
+        self.client = client
+        self.cache = cache
+    
+    @timed("perplexity", "upstream")
+    async def _post_completion(self, payload: Dict) -> httpx.Response:
+        """
+        POST a chat completion, reusing the shared client pool when one was injected.
+        
+        Raises CircuitOpenError without calling the upstream while
+        ``perplexity_breaker`` is open, and DeadlineExceeded when the request
+        deadline has already passed.
+        """
+        deadline.check()
+        if not perplexity_breaker.allow():
+            raise CircuitOpenError("Perplexity is unavailable (circuit breaker open)")
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        try:
+            if self.client is not None:
+                response = await self._post_with_retry(self.client, headers, payload)
+            else:
+                async with httpx.AsyncClient(timeout=settings.HTTP_TIMEOUT) as client:
+                    response = await self._post_with_retry(client, headers, payload)
+        except (asyncio.CancelledError, deadline.DeadlineExceeded):
+            perplexity_breaker.release()
+            raise
+        except Exception:
+            perplexity_breaker.record_failure()
+            raise
+        
+        if upstream_failed(response):
+            perplexity_breaker.record_failure()
+        else:
+            perplexity_breaker.record_success()
+        return response
+    
+    async def _post_with_retry(self, client: httpx.AsyncClient, headers: Dict, payload: Dict) -> httpx.Response:
+        """
+        Retry 429 and 5xx responses with jittered exponential backoff.
+        
+        A numeric Retry-After header from the upstream takes precedence over
+        the computed delay; one longer than PERPLEXITY_RETRY_MAX_DELAY is not
+        waited out, the response is returned instead. Each attempt's timeout is cut to what is left of
+        the request deadline, and no retry is made that could not finish in time.
+        A timeout that only happened because of the deadline raises
+        DeadlineExceeded, so one impatient client cannot open the breaker.
+        """
+        attempt = 0
+        while True:
+            timeout = deadline.timeout_for(settings.HTTP_TIMEOUT)
+            send = lambda: client.post(self.base_url, headers=headers, json=payload, timeout=timeout)
+            try:
+                if settings.PERPLEXITY_HEDGE_ENABLED:
+                    response = await perplexity_hedger.run(send, lambda response: not upstream_failed(response))
+                else:
+                    response = await send()
+            except httpx.TimeoutException as e:
+                if timeout < settings.HTTP_TIMEOUT:
+                    raise deadline.DeadlineExceeded("Request deadline exceeded") from e
+                raise
+            
+            if not self._should_retry(response, attempt):
+                return response
+            
+            delay = self._retry_delay(response, attempt)
+            left = deadline.remaining()
+            if left is not None and delay >= left:
+                return response
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    @staticmethod
+    def _should_retry(response: httpx.Response, attempt: int) -> bool:
+        if not upstream_failed(response) or attempt >= settings.PERPLEXITY_MAX_RETRIES:
+            return False
+        # An upstream asking for a long pause is down for now; don't park the caller that long
+        retry_after = response.headers.get("Retry-After", "")
+        return not (retry_after.isdigit() and float(retry_after) > settings.PERPLEXITY_RETRY_MAX_DELAY)
+    
+    @staticmethod
+    def _retry_delay(response: httpx.Response, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+        return settings.PERPLEXITY_RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+    
+    async def _stream_completion(self, payload: Dict) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding its content deltas as they arrive.
+        
+        The upstream answers with OpenAI-style Server-Sent Events. 429 and 5xx
+        responses are retried like ``_post_with_retry``; once content has
+        started flowing, errors are raised to the caller. The request deadline
+        bounds each wait for the upstream, not the length of the stream.
+        """
+        deadline.check()
+        if not perplexity_breaker.allow():
+            raise CircuitOpenError("Perplexity is unavailable (circuit breaker open)")
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream"
+        }
+        payload = {**payload, "stream": True}
+        
+        client = self.client or httpx.AsyncClient(timeout=settings.HTTP_TIMEOUT)
+        reported = False
+        timeout = settings.HTTP_TIMEOUT
+        try:
+            attempt = 0
+            while True:
+                timeout = deadline.timeout_for(settings.HTTP_TIMEOUT)
+                async with client.stream("POST", self.base_url, headers=headers, json=payload, timeout=timeout) as response:
+                    if response.status_code == 200:
+                        perplexity_breaker.record_success()
+                        reported = True
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                return
+                            try:
+                                chunk = json.loads(data)
+                            except ValueError:
+                                continue
+                            delta = (chunk.get("choices") or [{}])[0].get("delta") or {}
+                            if delta.get("content"):
+                                yield delta["content"]
+                        return
+                    
+                    if not upstream_failed(response):
+                        # A rejected request (4xx) still means the upstream is up
+                        perplexity_breaker.record_success()
+                        reported = True
+                    delay = self._retry_delay(response, attempt)
+                    left = deadline.remaining()
+                    if not self._should_retry(response, attempt) or (left is not None and delay >= left):
+                        raise RuntimeError(f"API error: {response.status_code}")
+                
+                await asyncio.sleep(delay)
+                attempt += 1
+        except (asyncio.CancelledError, deadline.DeadlineExceeded):
+            raise
+        except httpx.TimeoutException as e:
+            if not reported and timeout < settings.HTTP_TIMEOUT:
+                # Cut short by the request deadline: says nothing about the upstream
+                raise deadline.DeadlineExceeded("Request deadline exceeded") from e
+            if not reported:
+                perplexity_breaker.record_failure()
+                reported = True
+            raise
+        except Exception:
+            if not reported:
+                perplexity_breaker.record_failure()
+                reported = True
+            raise
+        finally:
+            if not reported:
+                perplexity_breaker.release()
+            if client is not self.client:
+                await client.aclose()
+    
+    @staticmethod
+    def analysis_cache_key(meme_data: Dict) -> str:
+        """
+        Content-addressed key for an analysis request.
+        
+        Score is bucketed by powers of two and age by
+        ANALYSIS_CACHE_AGE_BUCKET_HOURS, so polls of the same hot post reuse
+        one answer until it has moved meaningfully.
+        """
+        title = " ".join(str(meme_data.get('title') or '').split()).casefold()
+        subreddit = str(meme_data.get('subreddit') or '').casefold()
+        score = max(int(meme_data.get('score') or 0), 0)
+        age_hours = max(float(meme_data.get('age_hours') or 0), 0.0)
+        
+        normalized = [
+            title,
+            subreddit,
+            int(math.log2(score + 1)),
+            int(age_hours // settings.ANALYSIS_CACHE_AGE_BUCKET_HOURS)
+        ]
+        return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
     
+    @timed("perplexity")
     async def analyze_meme_virality(self, meme_data: Dict) -> Dict:
         """
         Analyze if a meme/post will go viral using Perplexity's real-time web search.
@@ -18,6 +245,12 @@ class PerplexityService:
         
         Returns:
             Dict with virality prediction, confidence, and reasoning
+        
+        Concurrent requests for the same post share one upstream call. That
+        call runs under the deadline of the request that started it, but never
+        less than the default PERPLEXITY_DEADLINE_SECONDS, so one short caller
+        does not cut it off for the rest. Each caller only stops waiting at its
+        own deadline.
         """
         
         if not self.api_key:
@@ -27,48 +260,78 @@ class PerplexityService:
                 "prediction": None
             }
         
-        prompt = self._build_analysis_prompt(meme_data)
+        if self.cache is None:
+            return await self._analyze_uncached(meme_data)
+        
+        left = deadline.remaining()
+        shared_seconds = settings.PERPLEXITY_DEADLINE_SECONDS if left is None else max(left, settings.PERPLEXITY_DEADLINE_SECONDS)
         
+        async def shared():
+            # Runs in the coalesced task, so this does not touch the caller's deadline
+            deadline.override(shared_seconds)
+            return await self._analyze_uncached(meme_data)
+        
+        try:
+            return await asyncio.wait_for(
+                self.cache.get_or_set(
+                    self.analysis_cache_key(meme_data),
+                    shared,
+                    should_cache=lambda result: result["success"] and not result.get("fallback")
+                ),
+                deadline.remaining()
+            )
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": "Request deadline exceeded",
+                "prediction": None
+            }
+    
+    def _analysis_payload(self, meme_data: Dict) -> Dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a viral content prediction AI. Analyze trends, news, and social media to predict if content will go viral. Always respond in JSON format."
+                },
+                {
+                    "role": "user",
+                    "content": self._build_analysis_prompt(meme_data)
+                }
+            ],
+            "temperature": 0.2,
+            "max_tokens": 500
+        }
+    
+    async def _analyze_uncached(self, meme_data: Dict) -> Dict:
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": "You are a viral content prediction AI. Analyze trends, news, and social media to predict if content will go viral. Always respond in JSON format."
-                            },
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        "temperature": 0.2,
-                        "max_tokens": 500
-                    }
-                )
+            response = await self._post_completion(self._analysis_payload(meme_data))
+            
+            if response.status_code == 200:
+                result = response.json()
+                analysis = self._parse_perplexity_response(result)
+                return {
+                    "success": True,
+                    "prediction": analysis,
+                    "raw_response": result
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"API error: {response.status_code}",
+                    "prediction": None
+                }
+        
+        except CircuitOpenError as e:
+            if settings.PERPLEXITY_BREAKER_FALLBACK:
+                return self._fallback_analysis()
+            return {
+                "success": False,
+                "error": str(e),
+                "prediction": None
+            }
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    analysis = self._parse_perplexity_response(result)
-                    return {
-                        "success": True,
-                        "prediction": analysis,
-                        "raw_response": result
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"API error: {response.status_code}",
-                        "prediction": None
-                    }
-                    
         except Exception as e:
             return {
                 "success": False,
@@ -76,6 +339,300 @@ class PerplexityService:
                 "prediction": None
             }
     
+    def _fallback_analysis(self) -> Dict:
+        """
+        Heuristic prediction served instead of an error while the circuit breaker is open.
+        
+        It is flagged ``fallback`` and never cached.
+        """
+        content = "Perplexity is temporarily unavailable; this is a heuristic estimate, not a web-backed analysis."
+        return {
+            "success": True,
+            "prediction": self._parse_perplexity_response({"choices": [{"message": {"content": content}}]}),
+            "raw_response": None,
+            "fallback": True
+        }
+    
+    async def stream_meme_virality(self, meme_data: Dict, deltas: bool = False) -> AsyncIterator[Dict]:
+        """
+        Analyze a post, yielding events while the completion streams in.
+        
+        Events (the ``event`` key names the kind):
+            field: one top-level prediction field (``name``, ``value``), as soon as it is complete
+            delta: raw completion text, only when ``deltas`` is set
+            analysis: the full parsed ``prediction``, last
+            error: the analysis failed; nothing follows
+        
+        Cached analyses are replayed without calling the upstream, and a
+        completed stream is cached for ``analyze_meme_virality`` as well.
+        While the circuit breaker is open, the heuristic fallback is replayed
+        (``fallback`` set on the analysis event) unless PERPLEXITY_BREAKER_FALLBACK is off.
+        """
+        if not self.api_key:
+            yield {"event": "error", "error": "PERPLEXITY_API_KEY not configured"}
+            return
+        
+        key = self.analysis_cache_key(meme_data)
+        cached = await self.cache.lookup(key) if self.cache is not None else None
+        if cached is not None:
+            for name, value in cached["prediction"].items():
+                yield {"event": "field", "name": name, "value": value}
+            yield {"event": "analysis", "prediction": cached["prediction"], "cached": True}
+            return
+        
+        parser = JSONFieldStream()
+        content = []
+        try:
+            async for delta in self._stream_completion(self._analysis_payload(meme_data)):
+                content.append(delta)
+                if deltas:
+                    yield {"event": "delta", "text": delta}
+                for name, value in parser.feed(delta):
+                    yield {"event": "field", "name": name, "value": value}
+        except CircuitOpenError as e:
+            if not settings.PERPLEXITY_BREAKER_FALLBACK:
+                yield {"event": "error", "error": str(e)}
+                return
+            prediction = self._fallback_analysis()["prediction"]
+            for name, value in prediction.items():
+                yield {"event": "field", "name": name, "value": value}
+            yield {"event": "analysis", "prediction": prediction, "cached": False, "fallback": True}
+            return
+        except Exception as e:
+            yield {"event": "error", "error": str(e)}
+            return
+        
+        raw_response = {"choices": [{"message": {"role": "assistant", "content": "".join(content)}}]}
+        try:
+            prediction = json.loads(parser.text) if parser.done else None
+        except ValueError:
+            prediction = None
+        if not isinstance(prediction, dict):
+            # No well-formed object in the stream: fall back to the lenient parser
+            prediction = self._parse_perplexity_response(raw_response)
+        
+        if self.cache is not None:
+            await self.cache.set(key, {"success": True, "prediction": prediction, "raw_response": raw_response})
+        yield {"event": "analysis", "prediction": prediction, "cached": False}
+    
+    async def analyze_batch(
+        self,
+        items: List[Dict],
+        concurrency: Optional[int] = None,
+        pack_size: Optional[int] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Analyze many posts concurrently, yielding each result as it completes.
+        
+        Cached items are answered first. The rest go out ``pack_size`` posts
+        per upstream call (see ``_analyze_pack``); a pack size of 1 makes one
+        call per post.
+        
+        Args:
+            items: meme_data dicts, as accepted by analyze_meme_virality
+            concurrency: Maximum in-flight upstream calls (defaults to PERPLEXITY_BATCH_CONCURRENCY)
+            pack_size: Posts per upstream call (defaults to PERPLEXITY_PACK_SIZE)
+        
+        Yields:
+            Result dicts tagged with the ``index`` of their item, in completion order
+        """
+        if not self.api_key:
+            for index in range(len(items)):
+                yield {"index": index, "success": False, "error": "PERPLEXITY_API_KEY not configured", "prediction": None}
+            return
+        
+        semaphore = asyncio.Semaphore(concurrency or settings.PERPLEXITY_BATCH_CONCURRENCY)
+        
+        pending = []
+        for index, meme_data in enumerate(items):
+            cached = await self.cache.lookup(self.analysis_cache_key(meme_data)) if self.cache is not None else None
+            if cached is not None:
+                yield {"index": index, **cached}
+            else:
+                pending.append((index, meme_data))
+        
+        packs = self._plan_packs(pending, pack_size or settings.PERPLEXITY_PACK_SIZE)
+        tasks = [asyncio.create_task(self._analyze_pack(pack, semaphore)) for pack in packs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for index, result in await next_done:
+                    yield {"index": index, **result}
+        finally:
+            # Client went away mid-stream: stop the remaining upstream calls
+            for task in tasks:
+                task.cancel()
+    
+    def _plan_packs(self, pending: List[Tuple[int, Dict]], pack_size: int) -> List[List[Tuple[int, Dict]]]:
+        """
+        Group posts into packs of at most ``pack_size`` that fit PERPLEXITY_PACK_MAX_TOKENS.
+        
+        Each post costs its prompt line plus PERPLEXITY_PACK_OUTPUT_TOKENS of answer.
+        """
+        budget = settings.PERPLEXITY_PACK_MAX_TOKENS
+        base = estimate_tokens(self._build_packed_prompt([]))
+        packs, current, tokens = [], [], base
+        for index, meme_data in pending:
+            cost = estimate_tokens(self._packed_post_line(f"p{index}", meme_data)) + settings.PERPLEXITY_PACK_OUTPUT_TOKENS
+            if current and (len(current) >= pack_size or tokens + cost > budget):
+                packs.append(current)
+                current, tokens = [], base
+            current.append((index, meme_data))
+            tokens += cost
+        if current:
+            packs.append(current)
+        return packs
+    
+    async def _analyze_pack(self, pack: List[Tuple[int, Dict]], semaphore: asyncio.Semaphore) -> List[Tuple[int, Dict]]:
+        """
+        Analyze a pack of posts in one completion and map the answers back by post ID.
+        
+        A truncated answer (``finish_reason == "length"``) splits the pack in
+        half and retries both halves. Posts missing from the answer or with
+        unusable entries fall back to single-post calls.
+        """
+        if len(pack) == 1:
+            # The cache was already checked when the batch was planned
+            index, meme_data = pack[0]
+            async with semaphore:
+                result = await self._analyze_uncached(meme_data)
+            if result["success"] and not result.get("fallback") and self.cache is not None:
+                await self.cache.set(self.analysis_cache_key(meme_data), result)
+            return [(index, result)]
+        
+        ids = {f"p{index}": (index, meme_data) for index, meme_data in pack}
+        async with semaphore:
+            try:
+                response = await self._post_completion(self._packed_payload(pack))
+            except CircuitOpenError as e:
+                if settings.PERPLEXITY_BREAKER_FALLBACK:
+                    return [(index, self._fallback_analysis()) for index, _ in pack]
+                return [(index, {"success": False, "error": str(e), "prediction": None}) for index, _ in pack]
+            except Exception as e:
+                return [(index, {"success": False, "error": str(e), "prediction": None}) for index, _ in pack]
+        
+        if response.status_code != 200:
+            error = f"API error: {response.status_code}"
+            return [(index, {"success": False, "error": error, "prediction": None}) for index, _ in pack]
+        
+        result = response.json()
+        choice = (result.get("choices") or [{}])[0]
+        predictions = self._parse_packed_response(choice.get("message", {}).get("content", ""), ids)
+        
+        if choice.get("finish_reason") == "length" and len(predictions) < len(pack):
+            middle = len(pack) // 2
+            halves = await asyncio.gather(
+                self._analyze_pack(pack[:middle], semaphore),
+                self._analyze_pack(pack[middle:], semaphore)
+            )
+            return halves[0] + halves[1]
+        
+        results = []
+        retry = []
+        for post_id, (index, meme_data) in ids.items():
+            prediction = predictions.get(post_id)
+            if prediction is None:
+                retry.append((index, meme_data))
+                continue
+            analysis = {"success": True, "prediction": prediction, "raw_response": None}
+            if self.cache is not None:
+                await self.cache.set(self.analysis_cache_key(meme_data), analysis)
+            results.append((index, analysis))
+        
+        if retry:
+            singles = await asyncio.gather(*(self._analyze_pack([item], semaphore) for item in retry))
+            for single in singles:
+                results.extend(single)
+        return results
+    
+    def _packed_payload(self, pack: List[Tuple[int, Dict]]) -> Dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a viral content prediction AI. Analyze trends, news, and social media to predict if content will go viral. Always respond in JSON format."
+                },
+                {
+                    "role": "user",
+                    "content": self._build_packed_prompt(pack)
+                }
+            ],
+            "temperature": 0.2,
+            "max_tokens": settings.PERPLEXITY_PACK_OUTPUT_TOKENS * len(pack) + 50
+        }
+    
+    @staticmethod
+    def _packed_post_line(post_id: str, meme_data: Dict) -> str:
+        return json.dumps({
+            "id": post_id,
+            "title": meme_data.get('title', ''),
+            "subreddit": meme_data.get('subreddit', ''),
+            "score": meme_data.get('score', 0),
+            "num_comments": meme_data.get('num_comments', 0),
+            "age_hours": meme_data.get('age_hours', 0)
+        })
+    
+    def _build_packed_prompt(self, pack: List[Tuple[int, Dict]]) -> str:
+        """
+        One prompt for several posts; the instructions are sent once per pack instead of once per post.
+        """
+        posts = "\n".join(self._packed_post_line(f"p{index}", meme_data) for index, meme_data in pack)
+        
+        prompt = f"""
+Analyze if each of these Reddit posts will go viral in the next 24 hours.
+
+Posts, one JSON object per line (score in upvotes, age in hours):
+{posts}
+
+For each post, search the web for:
+1. Is this topic currently trending on social media?
+2. Are there recent news articles about this topic?
+3. Is there high search volume for related keywords?
+4. Are influencers or major accounts discussing this?
+5. Is this a recurring viral topic or brand new?
+
+Respond with a JSON array containing one object per post, using the post's id:
+[
+  {{
+    "id": "p0",
+    "will_go_viral": true/false,
+    "virality_score": 0-100,
+    "confidence": 0-100,
+    "trending_factor": "HIGH/MEDIUM/LOW",
+    "predicted_peak_score": estimated_score,
+    "key_trends": ["trend1", "trend2"],
+    "reasoning": "one sentence"
+  }}
+]
+"""
+        return prompt
+    
+    @staticmethod
+    def _parse_packed_response(content: str, ids: Dict) -> Dict[str, Dict]:
+        """
+        Predictions from a packed answer, keyed by post ID.
+        
+        Entries with unknown IDs or without a numeric ``virality_score`` are dropped.
+        """
+        start = content.find("[")
+        if start < 0:
+            return {}
+        try:
+            entries, _ = json.JSONDecoder().raw_decode(content, start)
+        except ValueError:
+            return {}
+        if not isinstance(entries, list):
+            return {}
+        
+        predictions = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            post_id = entry.pop("id", None)
+            if post_id in ids and isinstance(entry.get("virality_score"), (int, float)):
+                predictions[post_id] = entry
+        return predictions
+    
     def _build_analysis_prompt(self, meme_data: Dict) -> str:
         """
         Build a detailed prompt for Perplexity analysis.
@@ -105,12 +662,12 @@ Search the web for:
 Respond in JSON format with:
 {{
   "will_go_viral": true/false,
-  "confidence": 0-100,
   "virality_score": 0-100,
-  "reasoning": "brief explanation",
+  "confidence": 0-100,
   "trending_factor": "HIGH/MEDIUM/LOW",
   "predicted_peak_score": estimated_score,
-  "key_trends": ["trend1", "trend2"]
+  "key_trends": ["trend1", "trend2"],
+  "reasoning": "brief explanation"
 }}
 """
         return prompt
@@ -157,14 +714,20 @@ Respond in JSON format with:
                 "error": str(e)
             }
     
+    @timed("perplexity")
     async def get_trending_topics(self) -> Dict:
         """
         Get current trending topics across the web.
+        
+        Concurrent calls are coalesced into a single Perplexity request.
         """
         
         if not self.api_key:
             return {"success": False, "error": "API key not configured"}
         
+        return await trending_flight.do("trending_topics", self._fetch_trending_topics)
+    
+    async def _fetch_trending_topics(self) -> Dict:
         prompt = """
 What are the top 10 trending topics on social media RIGHT NOW?
 
@@ -185,36 +748,28 @@ Respond in JSON format:
 """
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.3
-                    }
-                )
+            response = await self._post_completion({
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.3
+            })
+            
+            if response.status_code == 200:
+                result = response.json()
+                content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
-                    
-                    import json
-                    import re
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                    
-                    if json_match:
-                        trending = json.loads(json_match.group())
-                    else:
-                        trending = {"trending_topics": [], "timestamp": datetime.now().isoformat()}
-                    
-                    return {"success": True, "data": trending}
+                import json
+                import re
+                json_match = re.search(r'\{.*\}', content, re.DOTALL)
+                
+                if json_match:
+                    trending = json.loads(json_match.group())
                 else:
-                    return {"success": False, "error": f"API error: {response.status_code}"}
-                    
+                    trending = {"trending_topics": [], "timestamp": datetime.now().isoformat()}
+                
+                return {"success": True, "data": trending}
+            else:
+                return {"success": False, "error": f"API error: {response.status_code}"}
+                
         except Exception as e:
             return {"success": False, "error": str(e)}
\ No newline at end of file
@@ -0,0 +1,116 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.repositories.posts import PostRepository
+
+class PostWriter:
+    """
+    Streaming upsert stage for collected posts.
+    
+    Posts are buffered as they arrive and flushed to the ``posts`` table in
+    chunks of ``batch_size`` rows, or every ``flush_interval`` seconds while
+    rows are pending. Rows are deduped on ``reddit_id`` within a chunk and
+    each chunk is retried on its own, so one failure only loses that chunk.
+    ``on_written`` (sync or async) is called with every chunk that was stored.
+    
+    Usage:
+        async with PostWriter() as writer:
+            await writer.add(posts)
+    """
+    
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        on_written: Optional[Callable[[List[Dict]], Any]] = None
+    ):
+        self.batch_size = batch_size or settings.POSTS_UPSERT_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.POSTS_UPSERT_FLUSH_SECONDS
+        self.max_retries = settings.POSTS_UPSERT_MAX_RETRIES if max_retries is None else max_retries
+        self.on_written = on_written
+        self.posts = PostRepository()
+        
+        self._pending: Dict[str, Dict] = {}
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._closed = asyncio.Event()
+        self._started_at = time.monotonic()
+        
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.chunks_written = 0
+        self.chunks_failed = 0
+    
+    async def __aenter__(self) -> "PostWriter":
+        self._started_at = time.monotonic()
+        self._timer = asyncio.create_task(self._flush_periodically())
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def add(self, posts: List[Dict]) -> None:
+        for post in posts:
+            # Later rows for the same post carry fresher metrics
+            self._pending[post["reddit_id"]] = post
+            if len(self._pending) >= self.batch_size:
+                await self.flush()
+    
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            chunk = list(self._pending.values())
+            self._pending = {}
+            await self._write_chunk(chunk)
+    
+    async def close(self) -> None:
+        self._closed.set()
+        if self._timer is not None:
+            # Let an in-progress timed flush finish rather than cancel it mid-write
+            await self._timer
+            self._timer = None
+        await self.flush()
+    
+    async def _flush_periodically(self) -> None:
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+    
+    async def _write_chunk(self, chunk: List[Dict]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.posts.upsert(chunk)
+                self.rows_written += len(chunk)
+                self.chunks_written += 1
+                if self.on_written is not None:
+                    result = self.on_written(chunk)
+                    if inspect.isawaitable(result):
+                        await result
+                return
+            except Exception as e:
+                print(f"Database error (chunk of {len(chunk)}, attempt {attempt + 1}): {str(e)}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+        
+        self.rows_failed += len(chunk)
+        self.chunks_failed += 1
+    
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.monotonic() - self._started_at
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+    
+    def stats(self) -> Dict:
+        return {
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "chunks_written": self.chunks_written,
+            "chunks_failed": self.chunks_failed,
+            "rows_per_second": round(self.rows_per_second, 2)
+        }
@@ -1,117 +1,353 @@
-from datetime import datetime, timedelta
-from typing import List, Dict
-from app.core.database import supabase_admin
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import timed
+from app.core.pagination import Cursor, is_after
+from app.models.rows import POST_COLUMNS, SCORING_COLUMNS, PostColumns
+from app.repositories.posts import PostRepository
+from app.services.snapshot_store import snapshot_store
+from app.services.leaderboard_store import leaderboard_store
 import numpy as np
 
+TOP_WINDOW_HOURS = 6
+SUBREDDIT_WINDOW_HOURS = 12
+TRENDING_WINDOW_HOURS = 24
+TRENDING_MIN_SCORE = 50
+TRENDING_LIMIT = 20
+
 class PredictionService:
     def __init__(self):
+        self.posts = PostRepository()
         self.prediction_weights = {
             "score_velocity": 0.35,
             "comment_velocity": 0.25,
             "upvote_ratio": 0.20,
             "recency": 0.10,
-            "engagement_rate": 0.10
+            "engagement_rate": 0.10,
+            "score_acceleration": 0.05
         }
     
+    @staticmethod
+    def _utc(now: Optional[datetime]) -> datetime:
+        if now is None:
+            return datetime.now(timezone.utc)
+        if now.tzinfo is None:
+            return now.replace(tzinfo=timezone.utc)
+        return now
+    
+    @timed("prediction", "scoring")
+    def score_columns(
+        self,
+        columns: PostColumns,
+        now: datetime,
+        kinematics: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Score a columnar result set in one vectorized pass.
+        
+        Args:
+            columns: Result set in columnar form
+            now: Reference time shared by every post
+            kinematics: Windowed velocities and acceleration from the snapshot
+                store, aligned with ``columns``; NaN entries fall back to the
+                lifetime averages
+        
+        Returns:
+            Array of virality scores (0-100), aligned with ``columns``
+        """
+        if not len(columns):
+            return np.empty(0, dtype=np.float64)
+        
+        age_hours = np.maximum((now.timestamp() - columns.created) / 3600, 0.1)
+        score = columns.score
+        comments = columns.num_comments
+        
+        score_velocity = score / age_hours
+        comment_velocity = comments / age_hours
+        score_acceleration = 0
+        
+        if kinematics is not None:
+            score_velocity = np.where(np.isfinite(kinematics["score_velocity"]), kinematics["score_velocity"], score_velocity)
+            comment_velocity = np.where(np.isfinite(kinematics["comment_velocity"]), kinematics["comment_velocity"], comment_velocity)
+            score_acceleration = np.nan_to_num(kinematics["score_acceleration"], nan=0.0)
+        
+        engagement_rate = comments / np.maximum(score, 1)
+        
+        recency_score = np.maximum(0, 1 - (age_hours / 24))
+        
+        virality_score = (
+            (score_velocity * self.prediction_weights["score_velocity"]) +
+            (comment_velocity * self.prediction_weights["comment_velocity"]) +
+            (columns.upvote_ratio * self.prediction_weights["upvote_ratio"]) +
+            (recency_score * self.prediction_weights["recency"]) +
+            (engagement_rate * self.prediction_weights["engagement_rate"]) +
+            (score_acceleration * self.prediction_weights["score_acceleration"])
+        )
+        
+        return np.round(np.clip(virality_score * 10, 0, 100), 2)
+    
+    def score_posts(
+        self,
+        posts: List[Dict],
+        now: Optional[datetime] = None,
+        kinematics: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Score a list of post dicts in one vectorized pass, using one shared "now".
+        """
+        now = self._utc(now)
+        return self.score_columns(PostColumns.from_rows(posts, now.timestamp()), now, kinematics)
+    
     def calculate_virality_score(self, post: Dict) -> float:
         try:
-            current_time = datetime.utcnow()
-            created_time = datetime.fromisoformat(post.get("created_utc", current_time.isoformat()).replace('Z', '+00:00'))
-            age_hours = (current_time - created_time).total_seconds() / 3600
-            
-            if age_hours < 0.1:
-                age_hours = 0.1
-            
-            score = post.get("score", 0)
-            comments = post.get("num_comments", 0)
-            upvote_ratio = post.get("upvote_ratio", 0.5)
-            
-            score_velocity = score / age_hours if age_hours > 0 else 0
-            comment_velocity = comments / age_hours if age_hours > 0 else 0
-            
-            engagement_rate = comments / max(score, 1)
-            
-            recency_score = max(0, 1 - (age_hours / 24))
-            
-            virality_score = (
-                (score_velocity * self.prediction_weights["score_velocity"]) +
-                (comment_velocity * self.prediction_weights["comment_velocity"]) +
-                (upvote_ratio * self.prediction_weights["upvote_ratio"]) +
-                (recency_score * self.prediction_weights["recency"]) +
-                (engagement_rate * self.prediction_weights["engagement_rate"])
-            )
-            
-            normalized_score = min(100, max(0, virality_score * 10))
-            
-            return round(normalized_score, 2)
+            return float(self.score_posts([post])[0])
         
         except Exception as e:
             print(f"Error calculating virality score: {str(e)}")
             return 0.0
     
-    async def get_top_predictions(self, limit: int = 10) -> List[Dict]:
+    @timed("prediction")
+    async def load_kinematics(self, reddit_ids: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Fetch windowed velocity/acceleration for ``reddit_ids`` from the snapshot history.
+        
+        Returns None when disabled or unavailable, so scoring falls back to
+        lifetime averages.
+        """
+        if not settings.SNAPSHOT_VELOCITY_ENABLED or not reddit_ids:
+            return None
+        
         try:
-            cutoff_time = (datetime.utcnow() - timedelta(hours=6)).isoformat()
-            
-            result = supabase_admin.table("posts").select("*").gte("created_utc", cutoff_time).order("score", desc=True).limit(limit * 3).execute()
-            
-            posts = result.data
-            
-            scored_posts = []
-            for post in posts:
-                virality_score = self.calculate_virality_score(post)
-                post["virality_score"] = virality_score
-                scored_posts.append(post)
-            
-            scored_posts.sort(key=lambda x: x["virality_score"], reverse=True)
-            
-            return scored_posts[:limit]
+            return await snapshot_store.load_kinematics(reddit_ids)
+        except Exception as e:
+            print(f"Error loading post snapshots: {str(e)}")
+            return None
+    
+    @staticmethod
+    def rank_order(scores: np.ndarray, reddit_ids: List[str], mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Indices in (virality_score DESC, reddit_id ASC) order, optionally masked.
+        
+        Breaking ties on reddit_id gives every ranking the total order that
+        keyset cursors resume from.
+        """
+        order = np.lexsort((np.asarray(reddit_ids), -scores))
+        if mask is not None:
+            order = order[mask[order]]
+        return order
+    
+    @staticmethod
+    def after_mask(scores: np.ndarray, reddit_ids: List[str], cursor: Cursor) -> np.ndarray:
+        """
+        Vectorized ``is_after``: which rows sort after ``cursor``.
+        """
+        return (scores < cursor.virality_score) | ((scores == cursor.virality_score) & (np.asarray(reddit_ids) > cursor.reddit_id))
+    
+    @timed("prediction")
+    async def hydrate(self, reddit_ids: List[str], scores: List[float]) -> List[Dict]:
+        """
+        Fetch display columns for ranked posts and attach their virality scores.
+        """
+        rows = await self.posts.by_ids(reddit_ids, POST_COLUMNS)
+        by_id = {row["reddit_id"]: row for row in rows}
+        
+        ranked = []
+        for reddit_id, score in zip(reddit_ids, scores):
+            post = by_id.get(reddit_id)
+            if post is not None:
+                post["virality_score"] = score
+                ranked.append(post)
+        
+        return ranked
+    
+    async def _rank_window(
+        self,
+        hours: float,
+        limit: int,
+        now: Optional[datetime] = None,
+        subreddit: Optional[str] = None,
+        min_score: Optional[float] = None,
+        after: Optional[Cursor] = None
+    ) -> List[Dict]:
+        """
+        Rank the last ``hours`` of posts as of ``now`` and return one page.
+        
+        Every page ranks the same LEADERBOARD_MAX_POSTS highest-scoring posts
+        and, given the ``now`` of the first page, scores them identically, so
+        no post can move across the cursor between pages.
+        """
+        now = self._utc(now)
+        since = (now - timedelta(hours=hours)).replace(tzinfo=None)
+        rows = await self.posts.top_by_score(since, settings.LEADERBOARD_MAX_POSTS, subreddit=subreddit, columns=SCORING_COLUMNS)
+        
+        columns = PostColumns.from_rows(rows, now.timestamp())
+        kinematics = await self.load_kinematics(columns.reddit_id)
+        scores = self.score_columns(columns, now, kinematics)
+        
+        # Posts collected after ``now`` were not part of the ranking being paged through
+        mask = columns.created <= now.timestamp()
+        if min_score is not None:
+            mask &= scores > min_score
+        if after is not None:
+            mask &= self.after_mask(scores, columns.reddit_id, after)
+        order = self.rank_order(scores, columns.reddit_id, mask)[:limit]
+        
+        return await self.hydrate([columns.reddit_id[index] for index in order], scores[order].tolist())
+    
+    @timed("prediction")
+    def build_leaderboards(
+        self,
+        columns: PostColumns,
+        size: int,
+        kinematics: Optional[Dict[str, np.ndarray]] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, List[tuple]]:
+        """
+        Rank one result set into every precomputed leaderboard.
+        
+        ``columns`` should cover the widest window (TRENDING_WINDOW_HOURS).
+        Produces ``top``, ``trending`` and one ``subreddit:<name>`` board, each
+        a list of at most ``size`` (reddit_id, virality_score) pairs in order.
+        """
+        now = self._utc(now)
+        scores = self.score_columns(columns, now, kinematics)
+        age_hours = (now.timestamp() - columns.created) / 3600
+        
+        order = self.rank_order(scores, columns.reddit_id)
+        
+        def board(mask: np.ndarray) -> List[tuple]:
+            indices = order[mask[order]][:size]
+            return list(zip([columns.reddit_id[index] for index in indices], scores[indices].tolist()))
+        
+        boards = {
+            "top": board(age_hours <= TOP_WINDOW_HOURS),
+            "trending": board((age_hours <= TRENDING_WINDOW_HOURS) & (scores > TRENDING_MIN_SCORE))
+        }
+        
+        recent = age_hours <= SUBREDDIT_WINDOW_HOURS
+        for subreddit in set(columns.subreddit[recent].tolist()):
+            boards[f"subreddit:{subreddit}"] = board(recent & (columns.subreddit == subreddit))
+        
+        return boards
+    
+    @staticmethod
+    def _scoring_time(after: Optional[Cursor]) -> datetime:
+        # Later pages rank with the first page's clock, so scores do not drift across the cursor
+        if after is not None and after.scored_at is not None:
+            return datetime.fromtimestamp(after.scored_at, timezone.utc)
+        return datetime.now(timezone.utc)
+    
+    async def _read_board(self, name: str, limit: int, after: Optional[Cursor]) -> Optional[Tuple[List[Dict], datetime]]:
+        """
+        Serve a page from a precomputed leaderboard, with the time the board was scored at.
+        
+        Returns None, and the caller ranks the window itself, when:
+        - there is no board yet
+        - the page runs past the end of a board truncated at LEADERBOARD_SIZE
+        - the cursor was issued against another version of the board
+        
+        In the last two cases, the live ranking uses the cursor's scoring
+        time, so it continues the same ordering.
+        """
+        found = await leaderboard_store.read(name)
+        if found is None:
+            return None
+        board, scored_at = found
+        
+        if after is not None and after.scored_at != scored_at:
+            return None
+        
+        page = board if after is None else [post for post in board if is_after(post["virality_score"], post["reddit_id"], after)]
+        if len(page) < limit and len(board) >= settings.LEADERBOARD_SIZE:
+            return None
+        now = datetime.fromtimestamp(scored_at, timezone.utc) if scored_at is not None else datetime.now(timezone.utc)
+        return page[:limit], now
+    
+    @timed("prediction")
+    async def get_top_predictions(self, limit: int = 10, after: Optional[Cursor] = None) -> Tuple[List[Dict], datetime]:
+        """
+        One page of the top ranking and the time its scores are as of (for the next cursor).
+        """
+        page = await self._read_board("top", limit, after)
+        if page is not None:
+            return page
+        
+        now = self._scoring_time(after)
+        try:
+            return await self._rank_window(TOP_WINDOW_HOURS, limit, now, after=after), now
         
         except Exception as e:
             print(f"Error getting top predictions: {str(e)}")
-            return []
+            return [], now
     
-    async def get_trending(self, hours: int = 24) -> List[Dict]:
+    @timed("prediction")
+    async def get_trending(
+        self,
+        hours: int = 24,
+        limit: int = TRENDING_LIMIT,
+        after: Optional[Cursor] = None
+    ) -> Tuple[List[Dict], datetime]:
+        if hours == TRENDING_WINDOW_HOURS:
+            page = await self._read_board("trending", limit, after)
+            if page is not None:
+                return page
+        
+        now = self._scoring_time(after)
         try:
-            cutoff_time = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
-            
-            result = supabase_admin.table("posts").select("*").gte("created_utc", cutoff_time).order("score", desc=True).limit(50).execute()
-            
-            posts = result.data
-            
-            trending_posts = []
-            for post in posts:
-                virality_score = self.calculate_virality_score(post)
-                if virality_score > 50:
-                    post["virality_score"] = virality_score
-                    trending_posts.append(post)
-            
-            trending_posts.sort(key=lambda x: x["virality_score"], reverse=True)
-            
-            return trending_posts[:20]
+            return await self._rank_window(hours, limit, now, min_score=TRENDING_MIN_SCORE, after=after), now
         
         except Exception as e:
             print(f"Error getting trending: {str(e)}")
-            return []
+            return [], now
     
-    async def get_subreddit_predictions(self, subreddit: str, limit: int = 10) -> List[Dict]:
+    @timed("prediction")
+    async def get_subreddit_predictions(
+        self,
+        subreddit: str,
+        limit: int = 10,
+        after: Optional[Cursor] = None
+    ) -> Tuple[List[Dict], datetime]:
+        page = await self._read_board(f"subreddit:{subreddit}", limit, after)
+        if page is not None:
+            return page
+        
+        now = self._scoring_time(after)
         try:
-            cutoff_time = (datetime.utcnow() - timedelta(hours=12)).isoformat()
-            
-            result = supabase_admin.table("posts").select("*").eq("subreddit", subreddit).gte("created_utc", cutoff_time).order("score", desc=True).limit(limit * 2).execute()
-            
-            posts = result.data
-            
-            scored_posts = []
-            for post in posts:
-                virality_score = self.calculate_virality_score(post)
-                post["virality_score"] = virality_score
-                scored_posts.append(post)
-            
-            scored_posts.sort(key=lambda x: x["virality_score"], reverse=True)
-            
-            return scored_posts[:limit]
+            return await self._rank_window(SUBREDDIT_WINDOW_HOURS, limit, now, subreddit=subreddit, after=after), now
         
         except Exception as e:
             print(f"Error getting subreddit predictions: {str(e)}")
-            return []
\ No newline at end of file
+            return [], now
+    
+    async def export(
+        self,
+        since: datetime,
+        subreddit: Optional[str] = None,
+        min_score: Optional[float] = None,
+        page_size: int = 500
+    ) -> AsyncIterator[Dict]:
+        """
+        Score every post in a window, yielding each page's rows as soon as it is scored.
+        
+        Rows come in reddit_id order, not ranked, so only one page is ever
+        held in memory however large the window is.
+        """
+        after_id = None
+        while True:
+            rows = await self.posts.created_since(since, POST_COLUMNS, page_size, after_id=after_id, subreddit=subreddit)
+            if not rows:
+                return
+            
+            now = datetime.now(timezone.utc)
+            columns = PostColumns.from_rows(rows, now.timestamp())
+            kinematics = await self.load_kinematics(columns.reddit_id)
+            scores = self.score_columns(columns, now, kinematics).tolist()
+            
+            for post, score in zip(rows, scores):
+                if min_score is None or score > min_score:
+                    post["virality_score"] = score
+                    yield post
+            
+            if len(rows) < page_size:
+                return
+            after_id = rows[-1]["reddit_id"]
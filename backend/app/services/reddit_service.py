@@ -1,93 +1,142 @@
-import praw
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict
+from concurrent.futures import ThreadPoolExecutor
 from app.core.config import settings
-from app.core.database import supabase_admin
+from app.core.throttle import TokenBucket
+from app.core.metrics import record_collected, timed
+from app.services.post_writer import PostWriter
+from app.services.change_detector import change_detector, snapshot
+from app.services.snapshot_store import snapshot_store
+from app.services.leaderboard_service import LeaderboardService
+from app.services.collection_queue import collection_queue
 import asyncio
+import math
+import threading
 import time
 
+if TYPE_CHECKING:
+    import praw
+
+# Listing requests return at most 100 items per page
+REDDIT_PAGE_SIZE = 100
+
+# Shared by every RedditService in the process: the quota belongs to the OAuth client
+reddit_quota = TokenBucket(settings.REDDIT_REQUESTS_PER_MINUTE, settings.REDDIT_REQUEST_BURST)
+
+_executor = ThreadPoolExecutor(max_workers=settings.REDDIT_COLLECT_CONCURRENCY, thread_name_prefix="reddit")
+_local = threading.local()
+
 class RedditService:
     def __init__(self):
-        self.reddit = praw.Reddit(
-            client_id=settings.REDDIT_CLIENT_ID,
-            client_secret=settings.REDDIT_CLIENT_SECRET,
-            user_agent=settings.REDDIT_USER_AGENT
-        )
-        self.rate_limit_delay = 1.1
+        self.quota = reddit_quota
+    
+    @property
+    def reddit(self) -> "praw.Reddit":
+        # PRAW is not thread safe, so each worker thread gets its own client
+        reddit = getattr(_local, "reddit", None)
+        if reddit is None:
+            # Imported here: PRAW (and requests) is only needed once a collection runs
+            import praw
+            reddit = praw.Reddit(
+                client_id=settings.REDDIT_CLIENT_ID,
+                client_secret=settings.REDDIT_CLIENT_SECRET,
+                user_agent=settings.REDDIT_USER_AGENT,
+                reddit_url=settings.REDDIT_URL,
+                oauth_url=settings.REDDIT_OAUTH_URL,
+                check_for_updates=False
+            )
+            _local.reddit = reddit
+        return reddit
+    
+    @timed("reddit", "fetch_subreddit")
+    def _fetch_subreddit(self, subreddit_name: str, limit: int) -> List[Dict]:
+        """
+        Blocking PRAW fetch of one subreddit's hot listing; runs on the worker pool.
+        """
+        started = time.perf_counter()
+        subreddit = self.reddit.subreddit(subreddit_name)
         
-    async def collect_posts(self, subreddits: List[str] = None):
-        if subreddits is None:
-            subreddits = [
-                "technology",
-                "memes",
-                "funny",
-                "videos",
-                "gaming",
-                "worldnews",
-                "news",
-                "AskReddit",
-                "todayilearned",
-                "science"
-            ]
+        posts = []
+        for post in subreddit.hot(limit=limit):
+            posts.append({
+                "reddit_id": post.id,
+                "subreddit": subreddit_name,
+                "title": post.title,
+                "url": post.url,
+                "author": str(post.author),
+                "score": post.score,
+                "upvote_ratio": post.upvote_ratio,
+                "num_comments": post.num_comments,
+                "created_utc": datetime.fromtimestamp(post.created_utc).isoformat(),
+                "is_video": post.is_video,
+                "is_self": post.is_self,
+                "permalink": post.permalink,
+                "collected_at": datetime.utcnow().isoformat()
+            })
         
-        all_posts = []
+        limits = self.reddit.auth.limits
+        reset_timestamp = limits.get("reset_timestamp")
+        reset_in = reset_timestamp - time.time() if reset_timestamp else None
+        self.quota.sync(limits.get("remaining"), reset_in)
         
-        for subreddit_name in subreddits:
-            try:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                posts = subreddit.hot(limit=50)
-                
-                for post in posts:
-                    post_data = {
-                        "reddit_id": post.id,
-                        "subreddit": subreddit_name,
-                        "title": post.title,
-                        "url": post.url,
-                        "author": str(post.author),
-                        "score": post.score,
-                        "upvote_ratio": post.upvote_ratio,
-                        "num_comments": post.num_comments,
-                        "created_utc": datetime.fromtimestamp(post.created_utc).isoformat(),
-                        "is_video": post.is_video,
-                        "is_self": post.is_self,
-                        "permalink": post.permalink,
-                        "collected_at": datetime.utcnow().isoformat()
-                    }
-                    all_posts.append(post_data)
-                
-                await asyncio.sleep(self.rate_limit_delay)
-                
-            except Exception as e:
-                print(f"Error collecting from r/{subreddit_name}: {str(e)}")
-                continue
+        record_collected(subreddit_name, len(posts), time.perf_counter() - started)
+        return posts
+    
+    @staticmethod
+    async def _on_written(chunk: List[Dict]):
+        change_detector.commit(chunk)
+        await snapshot_store.append(chunk)
+    
+    @timed("reddit")
+    async def collect_subreddit(self, subreddit_name: str, limit: int = 50) -> Dict:
+        """
+        Fetch one subreddit and upsert its changed posts.
+        
+        Returns how many posts were fetched, how many had changed, and a
+        ``snapshot`` of the listing for the scheduler to diff the next poll
+        against. Errors are raised, so the job queue can retry the unit.
+        """
+        await self.quota.acquire(math.ceil(limit / REDDIT_PAGE_SIZE))
+        loop = asyncio.get_running_loop()
+        posts = await loop.run_in_executor(_executor, self._fetch_subreddit, subreddit_name, limit)
         
-        if all_posts:
-            try:
-                result = supabase_admin.table("posts").upsert(
-                    all_posts,
-                    on_conflict="reddit_id"
-                ).execute()
-                print(f"Successfully saved {len(all_posts)} posts")
-            except Exception as e:
-                print(f"Database error: {str(e)}")
+        changed = change_detector.changed(posts)
+        async with PostWriter(on_written=self._on_written) as writer:
+            await writer.add(changed)
         
-        return len(all_posts)
+        if writer.chunks_failed:
+            raise RuntimeError(f"{writer.rows_failed} posts from r/{subreddit_name} could not be saved")
+        return {"fetched": len(posts), "changed": len(changed), "listing": snapshot(posts)}
     
+    async def finish_collection(self) -> None:
+        """
+        Post-collection upkeep: prune the change index, downsample snapshots and rebuild leaderboards.
+        """
+        change_detector.prune(settings.CHANGE_INDEX_TTL_HOURS * 3600)
+        await snapshot_store.maybe_downsample()
+        await LeaderboardService().refresh()
+    
+    @timed("reddit")
     async def get_status(self) -> Dict:
+        """
+        Live state of the current (or most recent) collection job.
+        """
         try:
-            result = supabase_admin.table("posts").select("*", count="exact").limit(1).execute()
-            total_posts = result.count if hasattr(result, 'count') else 0
-            
-            recent_result = supabase_admin.table("posts").select("collected_at").order("collected_at", desc=True).limit(1).execute()
-            last_collection = recent_result.data[0]["collected_at"] if recent_result.data else None
+            latest, last_completed, queue = await asyncio.gather(
+                collection_queue.latest_job(),
+                collection_queue.last_completed_job(),
+                collection_queue.stats()
+            )
             
+            running = latest is not None and latest["status"] in ("queued", "running", "finalizing")
             return {
-                "total_posts": total_posts,
-                "last_collection": last_collection,
-                "status": "active"
+                "status": "running" if running else "idle",
+                "last_collection": last_completed["finished_at"] if last_completed else None,
+                "job": latest,
+                "queue": queue
             }
         except Exception as e:
             return {
                 "error": str(e),
                 "status": "error"
-            }
\ No newline at end of file
+            }
@@ -0,0 +1,157 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+import numpy as np
+from app.core.config import settings
+from app.repositories.snapshots import SnapshotRepository
+
+# How often the collector asks the database to downsample old snapshots
+DOWNSAMPLE_INTERVAL_SECONDS = 3600
+
+class SnapshotStore:
+    """
+    Append-only metric history for posts, backed by the ``post_snapshots`` table.
+    
+    The collector appends one (reddit_id, ts, score, comments, ratio) row per
+    written post. Rows older than SNAPSHOT_DOWNSAMPLE_AFTER_HOURS are thinned
+    to one per SNAPSHOT_DOWNSAMPLE_BUCKET_MINUTES bucket by the
+    ``downsample_post_snapshots`` database function.
+    """
+    
+    def __init__(self):
+        self.snapshots = SnapshotRepository()
+        self._last_downsample = 0.0
+    
+    async def append(self, posts: List[Dict]) -> None:
+        rows = [
+            {
+                "reddit_id": post["reddit_id"],
+                "ts": post.get("collected_at") or datetime.utcnow().isoformat(),
+                "score": post.get("score") or 0,
+                "num_comments": post.get("num_comments") or 0,
+                "upvote_ratio": post.get("upvote_ratio")
+            }
+            for post in posts
+        ]
+        if not rows:
+            return
+        
+        try:
+            await self.snapshots.append(rows)
+        except Exception as e:
+            print(f"Error appending snapshots: {str(e)}")
+    
+    async def maybe_downsample(self) -> None:
+        if time.monotonic() - self._last_downsample < DOWNSAMPLE_INTERVAL_SECONDS:
+            return
+        self._last_downsample = time.monotonic()
+        
+        try:
+            await self.snapshots.downsample(
+                settings.SNAPSHOT_DOWNSAMPLE_AFTER_HOURS,
+                settings.SNAPSHOT_DOWNSAMPLE_BUCKET_MINUTES,
+                settings.SNAPSHOT_RETENTION_DAYS
+            )
+        except Exception as e:
+            print(f"Error downsampling snapshots: {str(e)}")
+    
+    async def series(self, reddit_ids: List[str], since: datetime, page_size: int = 1000) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Per-post time series since ``since``.
+        
+        Returns:
+            Dict of reddit_id to arrays ``ts`` (epoch seconds), ``score``,
+            ``num_comments`` and ``upvote_ratio``, ordered by time
+        """
+        if not reddit_ids:
+            return {}
+        
+        unique_ids = list(set(reddit_ids))
+        rows = []
+        while True:
+            page = await self.snapshots.series_rows(unique_ids, since, page_size, offset=len(rows))
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+        
+        if not rows:
+            return {}
+        
+        ids = np.array([row["reddit_id"] for row in rows])
+        ts = np.array([row["ts"] for row in rows], dtype="datetime64[us]").astype(np.int64) / 1e6
+        score = np.array([row["score"] for row in rows], dtype=np.float64)
+        comments = np.array([row["num_comments"] for row in rows], dtype=np.float64)
+        ratio = np.array([0.5 if row["upvote_ratio"] is None else row["upvote_ratio"] for row in rows], dtype=np.float64)
+        
+        # Rows arrive sorted by reddit_id, so each post is one contiguous run
+        _, starts = np.unique(ids, return_index=True)
+        bounds = list(np.sort(starts)) + [len(rows)]
+        
+        return {
+            str(ids[start]): {
+                "ts": ts[start:end],
+                "score": score[start:end],
+                "num_comments": comments[start:end],
+                "upvote_ratio": ratio[start:end]
+            }
+            for start, end in zip(bounds, bounds[1:])
+        }
+    
+    @staticmethod
+    def kinematics(series: Dict[str, Dict[str, np.ndarray]], reddit_ids: List[str], now: float, window_seconds: float) -> Dict[str, np.ndarray]:
+        """
+        Windowed velocity and acceleration for many posts in one pass.
+        
+        Metrics are sampled (last observation carried forward) at now, now - W
+        and now - 2W. Velocities are per hour over the last window and
+        acceleration is the change in score velocity between the two windows.
+        Posts without history reaching back far enough get NaN.
+        """
+        count = len(reddit_ids)
+        nan = np.full(count, np.nan)
+        parts = [series.get(reddit_id) for reddit_id in reddit_ids]
+        lengths = np.array([0 if part is None else len(part["ts"]) for part in parts], dtype=np.int64)
+        if not lengths.any():
+            return {"score_velocity": nan, "comment_velocity": nan, "score_acceleration": nan.copy()}
+        
+        present = [part for part in parts if part is not None]
+        group = np.repeat(np.arange(count), lengths)
+        ts = np.concatenate([part["ts"] for part in present])
+        score = np.concatenate([part["score"] for part in present])
+        comments = np.concatenate([part["num_comments"] for part in present])
+        
+        # One sorted composite key (group, time) lets a single searchsorted
+        # find the last sample at or before each query time for every post
+        base = min(ts.min(), now - 2 * window_seconds)
+        span = max(ts.max(), now) - base + 1
+        keys = group * span + (ts - base)
+        
+        def sample_at(when: float):
+            query = np.arange(count) * span + (when - base)
+            index = np.searchsorted(keys, query, side="right") - 1
+            safe = np.clip(index, 0, len(keys) - 1)
+            valid = (index >= 0) & (group[safe] == np.arange(count))
+            return np.where(valid, score[safe], np.nan), np.where(valid, comments[safe], np.nan)
+        
+        score_now, comments_now = sample_at(now)
+        score_w, comments_w = sample_at(now - window_seconds)
+        score_2w, _ = sample_at(now - 2 * window_seconds)
+        
+        window_hours = window_seconds / 3600
+        score_velocity = (score_now - score_w) / window_hours
+        previous_velocity = (score_w - score_2w) / window_hours
+        
+        return {
+            "score_velocity": score_velocity,
+            "comment_velocity": (comments_now - comments_w) / window_hours,
+            "score_acceleration": (score_velocity - previous_velocity) / window_hours
+        }
+    
+    async def load_kinematics(self, reddit_ids: List[str]) -> Dict[str, np.ndarray]:
+        window_seconds = settings.SNAPSHOT_VELOCITY_WINDOW_MINUTES * 60
+        now = datetime.now(timezone.utc)
+        # Reach back past now - 2W so sparse series still have a sample to carry forward
+        series = await self.series(reddit_ids, since=now - timedelta(seconds=4 * window_seconds))
+        return self.kinematics(series, reddit_ids, now.timestamp(), window_seconds)
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import math
+import time
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.services.change_detector import change_detector
+from app.services.collection_queue import collection_queue
+from app.services.reddit_service import REDDIT_PAGE_SIZE
+
+# A subreddit whose polls mostly come back changed is fetched deeper; a mostly static one shallower
+DEEPEN_ABOVE_RATIO = 0.8
+SHALLOW_BELOW_RATIO = 0.3
+
+def request_cost(limit: int) -> int:
+    return max(1, math.ceil(limit / REDDIT_PAGE_SIZE))
+
+def learn(
+    stats: Optional[Dict],
+    fetched: int,
+    changed: Optional[int],
+    limit: int,
+    now: float,
+    smoothing: float
+) -> Dict:
+    """
+    Fold one poll of a subreddit into its learned stats.
+    
+    ``rate`` is a moving average of changed posts per minute since the
+    previous poll. ``ratio`` is the changed share of fetched posts. It drives
+    the next ``limit``: a subreddit that changes even at the bottom of its
+    listing is fetched deeper.
+    
+    ``changed`` is None when there was no previous listing to diff against.
+    Such a poll is recorded and counted in ``unlearned`` without learning from it.
+    """
+    stats = dict(stats or {})
+    previous = stats.get("polled_at")
+    
+    # On the first poll every post looks new, which says nothing about the change rate
+    if previous is not None and now > previous and changed is not None:
+        ratio = changed / fetched if fetched else 0.0
+        rate = changed / ((now - previous) / 60)
+        stats["ratio"] = ratio if "ratio" not in stats else smoothing * ratio + (1 - smoothing) * stats["ratio"]
+        stats["rate"] = rate if "rate" not in stats else smoothing * rate + (1 - smoothing) * stats["rate"]
+        
+        if stats["ratio"] > DEEPEN_ABOVE_RATIO:
+            limit = int(limit * 1.5)
+        elif stats["ratio"] < SHALLOW_BELOW_RATIO:
+            limit = int(limit * 0.75)
+    else:
+        stats["unlearned"] = stats.get("unlearned", 0) + 1
+    stats["limit"] = min(max(limit, settings.COLLECT_MIN_LIMIT), settings.COLLECT_MAX_LIMIT)
+    stats["polled_at"] = now
+    stats["polls"] = stats.get("polls", 0) + 1
+    return stats
+
+def allocate(
+    budget: float,
+    rates: Dict[str, float],
+    costs: Dict[str, int],
+    floor_polls: float,
+    cap_polls: float
+) -> Dict[str, float]:
+    """
+    Polls per minute for each subreddit within ``budget`` requests per minute.
+    
+    Everyone gets ``floor_polls`` first. The remainder is split by change
+    rate, and whatever a subreddit cannot use above ``cap_polls`` goes back to
+    the others.
+    """
+    polls = {name: floor_polls for name in rates}
+    spare = max(budget - floor_polls * sum(costs.values()), 0.0)
+    open_names = set(rates)
+    
+    while spare > 1e-9 and open_names:
+        total_rate = sum(rates[name] for name in open_names)
+        capped = set()
+        spent = 0.0
+        for name in open_names:
+            share = spare * rates[name] / total_rate if total_rate > 0 else spare / len(open_names)
+            extra = min(share / costs[name], cap_polls - polls[name])
+            polls[name] += extra
+            spent += extra * costs[name]
+            if polls[name] >= cap_polls - 1e-9:
+                capped.add(name)
+        spare -= spent
+        if not capped:
+            break
+        open_names -= capped
+    
+    return polls
+
+class MemoryPollStats:
+    """
+    Learned per-subreddit stats and last polled listings, kept by this process only.
+    """
+    backend = "memory"
+    
+    def __init__(self):
+        self._stats: Dict[str, Dict] = {}
+        self._listings: Dict[str, Dict[str, List]] = {}
+    
+    async def load(self, subreddits: List[str]) -> Dict[str, Dict]:
+        return {name: self._stats[name] for name in subreddits if name in self._stats}
+    
+    async def load_listing(self, subreddit: str) -> Optional[Dict[str, List]]:
+        return self._listings.get(subreddit)
+    
+    async def save(self, subreddit: str, stats: Dict, listing: Dict[str, List]) -> None:
+        self._stats[subreddit] = stats
+        self._listings[subreddit] = listing
+    
+    async def close(self) -> None:
+        pass
+
+class RedisPollStats:
+    """
+    Learned per-subreddit stats shared by every collector through Redis.
+    
+    The last polled listing of each subreddit is kept in its own hash, so
+    whichever collector makes the next poll can diff against it.
+    """
+    backend = "redis"
+    
+    KEY = "collect:stats"
+    LISTINGS_KEY = "collect:listings"
+    
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url, decode_responses=True)
+    
+    async def load(self, subreddits: List[str]) -> Dict[str, Dict]:
+        if not subreddits:
+            return {}
+        values = await self._redis.hmget(self.KEY, subreddits)
+        return {name: json.loads(raw) for name, raw in zip(subreddits, values) if raw is not None}
+    
+    async def load_listing(self, subreddit: str) -> Optional[Dict[str, List]]:
+        raw = await self._redis.hget(self.LISTINGS_KEY, subreddit)
+        return json.loads(raw) if raw is not None else None
+    
+    async def save(self, subreddit: str, stats: Dict, listing: Dict[str, List]) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.KEY, subreddit, json.dumps(stats))
+            pipe.hset(self.LISTINGS_KEY, subreddit, json.dumps(listing))
+            await pipe.execute()
+    
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+class SubredditScheduler:
+    """
+    Spreads a fixed Reddit request budget over the subreddit registry by how fast each one changes.
+    
+    Every subreddit is polled at least every ``max_interval`` seconds and at
+    most every ``min_interval`` seconds. The rest of ``budget`` (requests per
+    minute) is shared in proportion to each subreddit's learned change rate.
+    Subreddits with no rate yet are given the average, so new entries still
+    get explored. A poll costs one request per listing page.
+    
+    Each ``interval`` seconds, subreddits whose poll is due are queued as one
+    collection job, each at its learned depth.
+    """
+    
+    def __init__(
+        self,
+        queue,
+        stats,
+        subreddits: List[str] = settings.COLLECT_SUBREDDITS,
+        fixed_limits: Dict[str, int] = settings.COLLECT_SUBREDDIT_LIMITS,
+        budget: float = settings.COLLECT_REQUEST_BUDGET,
+        interval: float = settings.COLLECT_SCHEDULE_SECONDS,
+        min_interval: float = settings.COLLECT_MIN_INTERVAL_SECONDS,
+        max_interval: float = settings.COLLECT_MAX_INTERVAL_SECONDS,
+        smoothing: float = settings.COLLECT_RATE_SMOOTHING
+    ):
+        self.queue = queue
+        self.stats = stats
+        self.subreddits = list(subreddits)
+        self.fixed_limits = fixed_limits
+        self.budget = budget
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self._task: Optional[asyncio.Task] = None
+    
+    def limit_for(self, subreddit: str, stats: Optional[Dict]) -> int:
+        if subreddit in self.fixed_limits:
+            return self.fixed_limits[subreddit]
+        if stats and "limit" in stats:
+            return stats["limit"]
+        return settings.COLLECT_POSTS_PER_SUBREDDIT
+    
+    async def record(self, subreddit: str, listing: Dict[str, List], limit: int) -> None:
+        """
+        Learn from one finished poll of ``subreddit``, given the ``snapshot`` of its listing.
+        """
+        stats = (await self.stats.load([subreddit])).get(subreddit)
+        previous = await self.stats.load_listing(subreddit)
+        # Diffed against the previous poll by any collector, not against this process's change index
+        changed = change_detector.count_changed(previous, listing) if previous is not None else None
+        await self.stats.save(subreddit, learn(stats, len(listing), changed, limit, time.time(), self.smoothing), listing)
+    
+    async def schedule(self) -> List[Dict]:
+        """
+        Current allocation: limit, poll interval, poll counts and next due time per subreddit.
+        """
+        learned = await self.stats.load(self.subreddits)
+        limits = {name: self.limit_for(name, learned.get(name)) for name in self.subreddits}
+        costs = {name: request_cost(limit) for name, limit in limits.items()}
+        
+        known = [stats["rate"] for stats in learned.values() if "rate" in stats]
+        default_rate = sum(known) / len(known) if known else 1.0
+        rates = {name: learned.get(name, {}).get("rate", default_rate) for name in self.subreddits}
+        
+        polls = allocate(self.budget, rates, costs, 60 / self.max_interval, 60 / self.min_interval)
+        
+        schedule = []
+        for name in self.subreddits:
+            interval = 60 / polls[name]
+            polled_at = learned.get(name, {}).get("polled_at")
+            schedule.append({
+                "subreddit": name,
+                "limit": limits[name],
+                "interval_seconds": round(interval, 1),
+                "change_rate": round(learned[name]["rate"], 3) if "rate" in learned.get(name, {}) else None,
+                "changed_ratio": round(learned[name]["ratio"], 3) if "ratio" in learned.get(name, {}) else None,
+                "polls": learned.get(name, {}).get("polls", 0),
+                "unlearned_polls": learned.get(name, {}).get("unlearned", 0),
+                "last_polled_at": polled_at,
+                "next_poll_at": polled_at + interval if polled_at is not None else None
+            })
+        return schedule
+    
+    async def plan(self, due_only: bool = True) -> Dict[str, int]:
+        """
+        Subreddits to collect now, mapped to their listing depth.
+        """
+        now = time.time()
+        return {
+            entry["subreddit"]: entry["limit"]
+            for entry in await self.schedule()
+            if not due_only or entry["next_poll_at"] is None or entry["next_poll_at"] <= now
+        }
+    
+    async def tick(self) -> Optional[Dict]:
+        plan = await self.plan()
+        if not plan:
+            return None
+        job, created = await self.queue.enqueue(plan)
+        return job if created else None
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"Collection scheduler error: {str(e)}")
+            await asyncio.sleep(self.interval)
+    
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+def create_poll_stats():
+    if settings.COLLECT_QUEUE_BACKEND == "redis":
+        return RedisPollStats(settings.REDIS_URL)
+    return MemoryPollStats()
+
+subreddit_scheduler = SubredditScheduler(collection_queue, create_poll_stats())
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import httpx
+from app.core.config import settings
+from app.services.perplexity_service import PerplexityService
+
+class TrendingRefresher:
+    """
+    Keeps the latest trending topics in memory, refreshed in the background.
+    
+    Requests get the last good result immediately (stale-while-revalidate):
+    once it is older than ``refresh_interval`` a refresh is started in the
+    background and callers keep receiving the stale copy until it lands. Only
+    requests arriving before the first successful fetch wait for one.
+    """
+    
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        refresh_interval: float = settings.TRENDING_REFRESH_SECONDS,
+        retry_interval: float = settings.TRENDING_RETRY_SECONDS
+    ):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self._data: Optional[Dict] = None
+        self._fetched_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+    
+    async def refresh(self) -> bool:
+        """
+        Fetch trending topics now, keeping the previous result on failure.
+        """
+        try:
+            result = await PerplexityService(client=self.client).get_trending_topics()
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        
+        if result["success"]:
+            self._data = result["data"]
+            self._fetched_at = time.time()
+            self._last_error = None
+            return True
+        
+        self._last_error = result.get("error", "Unknown error")
+        print(f"Error refreshing trending topics: {self._last_error}")
+        return False
+    
+    def _revalidate(self) -> asyncio.Task:
+        # At most one refresh runs at a time, whoever triggers it
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self.refresh())
+        return self._refreshing
+    
+    async def _run(self) -> None:
+        while True:
+            ok = await self._revalidate()
+            await asyncio.sleep(self.refresh_interval if ok else self.retry_interval)
+    
+    def start(self) -> None:
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        for task in (self._loop_task, self._refreshing):
+            if task is not None and not task.done():
+                task.cancel()
+        self._loop_task = None
+    
+    def age(self) -> Optional[float]:
+        if self._fetched_at is None:
+            return None
+        return time.time() - self._fetched_at
+    
+    def freshness(self) -> Dict:
+        age = self.age()
+        return {
+            "fetched_at": None if self._fetched_at is None else datetime.fromtimestamp(self._fetched_at, timezone.utc).isoformat(),
+            "age_seconds": None if age is None else round(age, 1),
+            "stale": age is None or age > self.refresh_interval,
+            "refreshing": self._refreshing is not None and not self._refreshing.done(),
+            "last_error": self._last_error
+        }
+    
+    async def get(self) -> Dict:
+        """
+        Latest trending topics with freshness metadata.
+        
+        Returns the same shape as ``get_trending_topics`` plus ``freshness``.
+        """
+        if self._data is None:
+            # Cold start: wait for the refresh, shielded so a disconnecting
+            # client does not cancel it for everyone else
+            await asyncio.shield(self._revalidate())
+        elif self.age() > self.refresh_interval:
+            self._revalidate()
+        
+        if self._data is None:
+            return {"success": False, "error": self._last_error, "freshness": self.freshness()}
+        return {"success": True, "data": self._data, "freshness": self.freshness()}
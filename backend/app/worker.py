@@ -0,0 +1,52 @@
+"""
+Collector worker process.
+
+Runs Reddit collection jobs queued by ``POST /api/v1/reddit/collect`` or, with
+``COLLECT_SCHEDULE_ENABLED``, by the adaptive subreddit scheduler. Start
+as many as needed, on any host that can reach ``REDIS_URL``. Needs both
+``COLLECT_QUEUE_BACKEND`` and ``CACHE_BACKEND`` set to redis:
+
+    python -m app.worker
+"""
+import asyncio
+import signal
+from app.core.config import settings
+from app.core.database import close_db
+from app.services.change_detector import change_detector
+from app.services.collection_queue import collection_queue
+from app.services.collection_worker import CollectionWorker
+from app.services.leaderboard_store import leaderboard_store
+from app.services.subreddit_scheduler import subreddit_scheduler
+
+async def main():
+    if collection_queue.backend != "redis":
+        print("COLLECT_QUEUE_BACKEND is not redis; collection runs inside the web process")
+        return
+    if leaderboard_store.backend != "redis":
+        # Leaderboards published here would only live in this process, never reaching the web process
+        print("CACHE_BACKEND is not redis; a separate collector cannot publish leaderboards to the web process")
+        return
+    
+    worker = CollectionWorker(collection_queue, subreddit_scheduler)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.request_stop)
+    
+    warm_task = asyncio.create_task(change_detector.warm(hours=settings.CHANGE_INDEX_TTL_HOURS))
+    # Every collector may run the scheduler: while a job is in progress, ticks just see it and skip
+    if settings.COLLECT_SCHEDULE_ENABLED:
+        subreddit_scheduler.start()
+    print(f"Collector {worker.name} started ({worker.concurrency} concurrent units)")
+    try:
+        await worker.run(drain_timeout=settings.COLLECT_DRAIN_SECONDS)
+    finally:
+        warm_task.cancel()
+        await subreddit_scheduler.stop()
+        await leaderboard_store.close()
+        await close_db()
+        await collection_queue.close()
+        await subreddit_scheduler.stats.close()
+    print(f"Collector {worker.name} stopped ({worker.units_done} units done, {worker.units_failed} failed)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,12 @@
+import os
+
+# Settings require these at import time; benchmarks never talk to the real services
+for _name, _value in {
+    "REDDIT_CLIENT_ID": "bench",
+    "REDDIT_CLIENT_SECRET": "bench",
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_KEY": "bench",
+    "SUPABASE_SERVICE_KEY": "bench",
+    "SECRET_KEY": "bench",
+}.items():
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,94 @@
+"""
+Compare response rendering cost of FastAPI's default JSONResponse path
+against FastJSONResponse for prediction-shaped payloads.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_json --posts 100 500 --output results.json
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse
+from benchmarks.common import write_results
+
+def make_payload(n: int) -> dict:
+    """Build a /predictions/top style response holding n posts"""
+    now = datetime.now(timezone.utc)
+    predictions = []
+    for i in range(n):
+        predictions.append({
+            "id": i,
+            "reddit_id": f"t3_{i:06x}",
+            "title": f"Post number {i} about something mildly funny",
+            "subreddit": "memes",
+            "author": f"user{i}",
+            "url": f"https://i.redd.it/{i:06x}.jpg",
+            "permalink": f"/r/memes/comments/{i:06x}/",
+            "score": 1000 + i,
+            "num_comments": 50 + i % 200,
+            "upvote_ratio": 0.93,
+            "created_utc": now - timedelta(minutes=i),
+            "collected_at": now,
+            "virality_score": float(np.float64(87.5 - i * 0.01)),
+        })
+    return {"success": True, "count": n, "predictions": predictions}
+
+def default_render(payload: dict) -> bytes:
+    # What FastAPI does for a plain dict return value
+    return JSONResponse(jsonable_encoder(payload)).body
+
+def fast_render(payload: dict) -> bytes:
+    return FastJSONResponse(payload).body
+
+def measure(fn, payload: dict, min_seconds: float) -> dict:
+    """Call fn repeatedly for at least min_seconds and report throughput"""
+    fn(payload)
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        fn(payload)
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "per_second": iterations / elapsed,
+        "mean_ms": elapsed / iterations * 1000,
+    }
+
+def run(sizes, min_seconds: float) -> list:
+    results = []
+    for n in sizes:
+        payload = make_payload(n)
+        baseline = measure(default_render, payload, min_seconds)
+        fast = measure(fast_render, payload, min_seconds)
+        results.append({
+            "posts": n,
+            "default": baseline,
+            "orjson": fast,
+            "speedup": fast["per_second"] / baseline["per_second"],
+        })
+        print(f"{n:>6} posts  default {baseline['mean_ms']:8.3f} ms  "
+              f"orjson {fast['mean_ms']:8.3f} ms  x{results[-1]['speedup']:.1f}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON response rendering benchmark")
+    parser.add_argument("--posts", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--seconds", type=float, default=1.0, help="Minimum time per measurement")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+    
+    results = run(args.posts, args.seconds)
+    
+    if args.output:
+        write_results(args.output, "json_render", results, {"posts": args.posts, "seconds": args.seconds})
+
+if __name__ == "__main__":
+    main()
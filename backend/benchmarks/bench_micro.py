@@ -0,0 +1,91 @@
+"""
+Micro-benchmarks for the scoring and response-parsing hot paths.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_micro --sizes 1000 10000 100000 1000000 --output micro.json
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from app.services.perplexity_service import PerplexityService
+from app.services.prediction_service import PredictionService
+from benchmarks.common import write_results
+from benchmarks.fakes import make_posts
+
+def make_responses(count: int) -> List[Dict]:
+    """Chat completion payloads alternating clean JSON, prose-wrapped JSON and fenced JSON"""
+    prediction = {
+        "will_go_viral": True,
+        "confidence": 80,
+        "virality_score": 75,
+        "reasoning": "Topic is trending across platforms",
+        "trending_factor": "HIGH",
+        "predicted_peak_score": 12000,
+        "key_trends": ["ai", "memes"]
+    }
+    templates = [
+        json.dumps(prediction),
+        "Here is my analysis:\n" + json.dumps(prediction, indent=2) + "\nHope this helps.",
+        "```json\n" + json.dumps(prediction) + "\n```"
+    ]
+    return [
+        {"choices": [{"message": {"content": templates[i % len(templates)]}}]}
+        for i in range(count)
+    ]
+
+def run_once(name: str, size: int, fn: Callable[[], object]) -> Dict:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    result = {
+        "benchmark": name,
+        "items": size,
+        "seconds": round(elapsed, 6),
+        "items_per_second": round(size / elapsed, 1) if elapsed else None,
+        "us_per_item": round(elapsed / size * 1e6, 3)
+    }
+    print(f"{name:<32} {size:>9}  {elapsed:9.3f} s  {result['us_per_item']:9.3f} us/item")
+    return result
+
+def run(sizes: List[int]) -> List[Dict]:
+    predictions = PredictionService()
+    perplexity = PerplexityService()
+    results = []
+    
+    for size in sizes:
+        posts = make_posts(size)
+        responses = make_responses(size)
+        now = datetime.now(timezone.utc)
+        
+        results.append(run_once(
+            "calculate_virality_score", size,
+            lambda: [predictions.calculate_virality_score(post) for post in posts]
+        ))
+        results.append(run_once(
+            "score_posts (vectorized)", size,
+            lambda: predictions.score_posts(posts, now)
+        ))
+        results.append(run_once(
+            "_parse_perplexity_response", size,
+            lambda: [perplexity._parse_perplexity_response(response) for response in responses]
+        ))
+    
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring and parsing micro-benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+    
+    results = run(args.sizes)
+    
+    if args.output:
+        write_results(args.output, "micro", results, {"sizes": args.sizes})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import json
+import math
+import platform
+import socket
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+def summarize_latencies(latencies: List[float], elapsed: float, errors: int = 0, first_bytes: Optional[List[float]] = None) -> Dict:
+    """
+    Throughput and latency percentiles (milliseconds) for one load test scenario.
+    
+    ``first_bytes`` are times to the first body byte, reported as ``ttfb_*``.
+    """
+    ordered = sorted(latencies)
+    summary = {
+        "requests": len(ordered),
+        "errors": errors,
+        "duration_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p90_ms": round(percentile(ordered, 90) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0
+    }
+    if first_bytes is not None:
+        first = sorted(first_bytes)
+        summary["ttfb_p50_ms"] = round(percentile(first, 50) * 1000, 3)
+        summary["ttfb_p99_ms"] = round(percentile(first, 99) * 1000, 3)
+    return summary
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(path: str, benchmark: str, results, config: Dict) -> None:
+    """
+    Write results with enough context (commit, interpreter, settings) to compare runs.
+    """
+    document = {
+        "benchmark": benchmark,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config,
+        "results": results
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {path}")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
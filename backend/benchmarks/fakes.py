@@ -0,0 +1,355 @@
+"""
+Local stand-ins for PostgREST (Supabase), the Reddit API and the Perplexity
+chat endpoint, each with configurable latency injection.
+
+Run standalone (the load test starts it for you):
+
+    python -m benchmarks.fakes --posts 5000 --postgrest-latency 5 --perplexity-latency 800
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+SUBREDDITS = ["memes", "dankmemes", "wholesomememes", "ProgrammerHumor", "funny", "technology", "gaming", "movies"]
+
+class Latency:
+    """
+    Injected delay of ``base_ms`` plus up to ``jitter_ms`` of uniform noise.
+    """
+    
+    def __init__(self, base_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+    
+    async def wait(self) -> None:
+        delay = self.base_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+def make_posts(count: int, seed: int = 7) -> List[Dict]:
+    """
+    Deterministic synthetic posts spread over the last 24 hours.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    posts = []
+    for i in range(count):
+        score = int(rng.paretovariate(1.2) * 50)
+        posts.append({
+            "id": i + 1,
+            "reddit_id": f"b{i:07x}",
+            "subreddit": SUBREDDITS[i % len(SUBREDDITS)],
+            "title": f"Synthetic post {i} about a mildly funny thing",
+            "url": f"https://i.redd.it/b{i:07x}.jpg",
+            "author": f"user{rng.randint(1, 5000)}",
+            "score": score,
+            "upvote_ratio": round(rng.uniform(0.6, 0.99), 2),
+            "num_comments": int(score * rng.uniform(0.02, 0.3)),
+            "created_utc": (now - timedelta(seconds=rng.uniform(0, 86400))).isoformat(),
+            "is_video": False,
+            "is_self": False,
+            "permalink": f"/r/memes/comments/b{i:07x}/",
+            "collected_at": now.isoformat()
+        })
+    return posts
+
+def _coerce(value: str, sample):
+    if isinstance(sample, bool):
+        return value == "true"
+    if isinstance(sample, (int, float)):
+        return float(value)
+    return value
+
+def _matches(row: Dict, column: str, expression: str) -> bool:
+    operator, _, argument = expression.partition(".")
+    value = row.get(column)
+    if operator == "in":
+        return str(value) in argument.strip("()").split(",")
+    if value is None:
+        return False
+    argument = _coerce(argument, value)
+    if operator == "eq":
+        return value == argument
+    if operator == "gt":
+        return value > argument
+    if operator == "gte":
+        return value >= argument
+    if operator == "lt":
+        return value < argument
+    if operator == "lte":
+        return value <= argument
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+def _sort(rows: List[Dict], order: str) -> List[Dict]:
+    # Apply keys from last to first; Python's sort is stable
+    for term in reversed(order.split(",")):
+        column, _, direction = term.partition(".")
+        rows.sort(key=lambda row: row.get(column) or 0, reverse=direction.startswith("desc"))
+    return rows
+
+class FakePostgrest:
+    """
+    The slice of PostgREST the app uses: filtered/ordered/ranged selects,
+    counts, upserts and the snapshot downsampling RPC.
+    """
+    
+    def __init__(self, posts: List[Dict], latency: Latency):
+        self.tables: Dict[str, Dict] = {
+            "posts": {post["reddit_id"]: post for post in posts},
+            "post_snapshots": {}
+        }
+        self.latency = latency
+        self.app = Starlette(routes=[
+            Route("/health", self.health),
+            Route("/rpc/{function}", self.rpc, methods=["POST"]),
+            Route("/{table}", self.select, methods=["GET"]),
+            Route("/{table}", self.upsert, methods=["POST"])
+        ])
+    
+    async def health(self, request: Request) -> Response:
+        return JSONResponse({"ok": True})
+    
+    async def select(self, request: Request) -> Response:
+        await self.latency.wait()
+        table = self.tables.get(request.path_params["table"])
+        if table is None:
+            return JSONResponse({"message": "relation does not exist"}, status_code=404)
+        
+        rows = list(table.values())
+        params = request.query_params
+        for column, expression in params.multi_items():
+            if column not in ("select", "order", "limit", "offset"):
+                rows = [row for row in rows if _matches(row, column, expression)]
+        
+        total = len(rows)
+        if "order" in params:
+            rows = _sort(rows, params["order"])
+        
+        start, end = 0, len(rows) - 1
+        if "range" in request.headers:
+            first, _, last = request.headers["range"].partition("-")
+            start, end = int(first), int(last)
+        if "offset" in params:
+            start = int(params["offset"])
+        if "limit" in params:
+            end = min(end, start + int(params["limit"]) - 1)
+        rows = rows[start:end + 1]
+        
+        columns = params.get("select", "*")
+        if columns != "*":
+            names = columns.split(",")
+            rows = [{name: row.get(name) for name in names} for row in rows]
+        
+        headers = {"Content-Range": f"{start}-{start + len(rows) - 1}/{total}"}
+        return JSONResponse(rows, headers=headers)
+    
+    async def upsert(self, request: Request) -> Response:
+        await self.latency.wait()
+        name = request.path_params["table"]
+        table = self.tables.setdefault(name, {})
+        body = json.loads(await request.body())
+        for row in body if isinstance(body, list) else [body]:
+            key = row.get("reddit_id") if name == "posts" else (row.get("reddit_id"), row.get("ts"))
+            table[key] = {**table.get(key, {}), **row}
+        return Response(status_code=201)
+    
+    async def rpc(self, request: Request) -> Response:
+        await self.latency.wait()
+        return JSONResponse(0)
+
+class FakeReddit:
+    """
+    OAuth token endpoint and ``/r/{subreddit}/hot`` listings in Reddit's wire format.
+    """
+    
+    def __init__(self, latency: Latency, seed: int = 11):
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.app = Starlette(routes=[
+            Route("/health", self.health),
+            Route("/api/v1/access_token", self.token, methods=["POST"]),
+            Route("/r/{subreddit}/hot", self.hot)
+        ])
+    
+    async def health(self, request: Request) -> Response:
+        return JSONResponse({"ok": True})
+    
+    async def token(self, request: Request) -> Response:
+        return JSONResponse({"access_token": "bench", "token_type": "bearer", "expires_in": 86400, "scope": "*"})
+    
+    async def hot(self, request: Request) -> Response:
+        await self.latency.wait()
+        subreddit = request.path_params["subreddit"]
+        limit = int(request.query_params.get("limit", 25))
+        now = time.time()
+        children = []
+        for i in range(limit):
+            score = int(self.rng.paretovariate(1.2) * 50)
+            post_id = f"{subreddit[:3].lower()}{i:05d}"
+            children.append({"kind": "t3", "data": {
+                "id": post_id,
+                "name": f"t3_{post_id}",
+                "title": f"{subreddit} hot post {i}",
+                "url": f"https://i.redd.it/{post_id}.jpg",
+                "author": f"user{i}",
+                "score": score,
+                "upvote_ratio": 0.9,
+                "num_comments": score // 10,
+                "created_utc": now - self.rng.uniform(0, 86400),
+                "is_video": False,
+                "is_self": False,
+                "permalink": f"/r/{subreddit}/comments/{post_id}/"
+            }})
+        headers = {"x-ratelimit-remaining": "600", "x-ratelimit-used": "0", "x-ratelimit-reset": "600"}
+        return JSONResponse({"kind": "Listing", "data": {"after": None, "children": children}}, headers=headers)
+
+class FakePerplexity:
+    """
+    Chat completions endpoint answering with a well-formed prediction.
+    
+    ``latency`` is the time to the first token and every ``token_ms`` adds one
+    more. A non-streaming reply takes the sum. With ``"stream": true`` the
+    content is sent as OpenAI-style SSE chunks, one per token. To mimic a
+    degraded upstream, ``slow_fraction`` of calls wait ``slow_ms`` longer and
+    ``error_rate`` of calls answer 503.
+    """
+    
+    # Characters per simulated token
+    TOKEN_CHARS = 4
+    
+    def __init__(
+        self,
+        latency: Latency,
+        token_ms: float = 0.0,
+        slow_fraction: float = 0.0,
+        slow_ms: float = 0.0,
+        error_rate: float = 0.0
+    ):
+        self.latency = latency
+        self.token_ms = token_ms
+        self.slow_fraction = slow_fraction
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.calls = 0
+        self.prompt_chars = 0
+        self.app = Starlette(routes=[
+            Route("/health", self.health),
+            Route("/stats", self.stats),
+            Route("/chat/completions", self.completions, methods=["POST"])
+        ])
+    
+    async def health(self, request: Request) -> Response:
+        return JSONResponse({"ok": True})
+    
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse({"calls": self.calls, "prompt_chars": self.prompt_chars})
+    
+    async def completions(self, request: Request) -> Response:
+        body = json.loads(await request.body())
+        prompt = "".join(message.get("content", "") for message in body.get("messages", []))
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        
+        prediction = {
+            "will_go_viral": True,
+            "virality_score": 75,
+            "confidence": 80,
+            "trending_factor": "MEDIUM",
+            "predicted_peak_score": 5000,
+            "key_trends": ["benchmarks"],
+            "reasoning": "Synthetic benchmark response"
+        }
+        # Packed prompts list posts as JSON lines with an "id"; answer with one entry per post
+        post_ids = re.findall(r'\{"id": "([^"]+)"', prompt)
+        if post_ids:
+            content = json.dumps([{"id": post_id, **prediction} for post_id in post_ids])
+        else:
+            content = json.dumps({
+                **prediction,
+                "trending_topics": [{"topic": "benchmarks", "trend_score": 90, "platforms": ["reddit"], "description": "synthetic"}]
+            })
+        tokens = [content[i:i + self.TOKEN_CHARS] for i in range(0, len(content), self.TOKEN_CHARS)]
+        await self.latency.wait()
+        if random.random() < self.slow_fraction:
+            await asyncio.sleep(self.slow_ms / 1000)
+        if random.random() < self.error_rate:
+            return JSONResponse({"error": "upstream unavailable"}, status_code=503)
+        
+        if body.get("stream"):
+            async def events():
+                for token in tokens:
+                    chunk = {"choices": [{"index": 0, "delta": {"role": "assistant", "content": token}}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    if self.token_ms:
+                        await asyncio.sleep(self.token_ms / 1000)
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+        
+        if self.token_ms:
+            await asyncio.sleep(len(tokens) * self.token_ms / 1000)
+        return JSONResponse({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+def serve(apps: Dict[int, Starlette]) -> List[uvicorn.Server]:
+    """
+    Serve each app on its 127.0.0.1 port from a background thread; returns once all are listening.
+    """
+    servers = []
+    for port, app in apps.items():
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+        threading.Thread(target=server.run, daemon=True).start()
+        servers.append(server)
+    while not all(server.started for server in servers):
+        time.sleep(0.05)
+    return servers
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-ins for PostgREST, Reddit and Perplexity")
+    parser.add_argument("--posts", type=int, default=5000, help="Rows seeded into the posts table")
+    parser.add_argument("--postgrest-port", type=int, default=54321)
+    parser.add_argument("--reddit-port", type=int, default=54322)
+    parser.add_argument("--perplexity-port", type=int, default=54323)
+    parser.add_argument("--postgrest-latency", type=float, default=0.0, help="Milliseconds added to each query")
+    parser.add_argument("--reddit-latency", type=float, default=0.0, help="Milliseconds added to each listing")
+    parser.add_argument("--perplexity-latency", type=float, default=0.0, help="Milliseconds before the first completion token")
+    parser.add_argument("--perplexity-token-ms", type=float, default=0.0, help="Milliseconds per further completion token")
+    parser.add_argument("--perplexity-slow-fraction", type=float, default=0.0, help="Share of completions delayed by --perplexity-slow-ms")
+    parser.add_argument("--perplexity-slow-ms", type=float, default=0.0, help="Extra milliseconds for slow completions")
+    parser.add_argument("--perplexity-error-rate", type=float, default=0.0, help="Share of completions answered with 503")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency, in milliseconds")
+    args = parser.parse_args()
+    
+    serve({
+        args.postgrest_port: FakePostgrest(make_posts(args.posts), Latency(args.postgrest_latency, args.jitter)).app,
+        args.reddit_port: FakeReddit(Latency(args.reddit_latency, args.jitter)).app,
+        args.perplexity_port: FakePerplexity(
+            Latency(args.perplexity_latency, args.jitter),
+            args.perplexity_token_ms,
+            args.perplexity_slow_fraction,
+            args.perplexity_slow_ms,
+            args.perplexity_error_rate
+        ).app
+    })
+    print(f"PostgREST  http://127.0.0.1:{args.postgrest_port}")
+    print(f"Reddit     http://127.0.0.1:{args.reddit_port}")
+    print(f"Perplexity http://127.0.0.1:{args.perplexity_port}/chat/completions", flush=True)
+    
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
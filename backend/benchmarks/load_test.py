@@ -0,0 +1,242 @@
+"""
+End-to-end load test of the API against local fake upstreams.
+
+Starts the fake PostgREST/Reddit/Perplexity servers and the app (under
+uvicorn) as subprocesses, runs one collection so leaderboards exist, then
+drives each scenario at a fixed concurrency and reports requests/sec and
+p50/p90/p99 latency.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --duration 10 --concurrency 32 \
+        --postgrest-latency 5 --perplexity-latency 800 --output load.json
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import free_port, summarize_latencies, write_results
+
+def scenarios(perplexity: bool) -> Dict[str, Callable[[int], Dict]]:
+    """Request builders by scenario name; each gets a running request counter"""
+    builders = {
+        "predictions_top": lambda i: {"method": "GET", "url": "/api/v1/predictions/top?limit=10"},
+        "predictions_top_50": lambda i: {"method": "GET", "url": "/api/v1/predictions/top?limit=50"},
+        "predictions_trending": lambda i: {"method": "GET", "url": "/api/v1/predictions/trending"},
+        "predictions_subreddit": lambda i: {"method": "GET", "url": "/api/v1/predictions/subreddit/memes?limit=20"},
+        "reddit_status": lambda i: {"method": "GET", "url": "/api/v1/reddit/status"},
+        "health": lambda i: {"method": "GET", "url": "/api/v1/health/"}
+    }
+    if perplexity:
+        builders["perplexity_trending_now"] = lambda i: {"method": "GET", "url": "/api/v1/perplexity/trending-now"}
+        # Distinct titles so every request misses the analysis cache and reaches the upstream
+        builders["perplexity_analyze_uncached"] = lambda i: {
+            "method": "POST",
+            "url": "/api/v1/perplexity/analyze-meme",
+            "json": {"title": f"Load test post {i}", "subreddit": "memes", "score": 100, "num_comments": 10, "age_hours": 1}
+        }
+        # 20 uncached posts per request, one upstream call per post vs packed
+        for name, pack_size in (("perplexity_batch_single", 1), ("perplexity_batch_packed", 10)):
+            builders[name] = lambda i, pack_size=pack_size: {
+                "method": "POST",
+                "url": "/api/v1/perplexity/analyze-batch",
+                "json": {
+                    "items": [{"title": f"Load test batch {pack_size} {i} {n}", "subreddit": "memes", "score": 100} for n in range(20)],
+                    "pack_size": pack_size
+                }
+            }
+        builders["perplexity_analyze_stream"] = lambda i: {
+            "method": "POST",
+            "url": "/api/v1/perplexity/analyze-meme/stream",
+            "json": {"title": f"Load test stream {i}", "subreddit": "memes", "score": 100, "num_comments": 10, "age_hours": 1}
+        }
+    return builders
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Timed out waiting for {url}")
+            await asyncio.sleep(0.1)
+
+async def warm_up(client: httpx.AsyncClient, timeout: float = 120.0) -> bool:
+    """
+    Trigger a collection and wait for its leaderboards to be published.
+    
+    A published leaderboard version shows up as an ETag on prediction responses.
+    """
+    await client.post("/api/v1/reddit/collect")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = await client.get("/api/v1/predictions/top")
+        if "etag" in response.headers:
+            return True
+        await asyncio.sleep(0.5)
+    return False
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    build: Callable[[int], Dict],
+    concurrency: int,
+    duration: float
+) -> Dict:
+    counter = itertools.count()
+    latencies: List[float] = []
+    first_bytes: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            request = build(next(counter))
+            start = time.perf_counter()
+            first_byte = None
+            try:
+                async with client.stream(**request) as response:
+                    async for chunk in response.aiter_raw():
+                        if first_byte is None and chunk:
+                            first_byte = time.perf_counter() - start
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+                first_bytes.append(first_byte if first_byte is not None else latencies[-1])
+            else:
+                errors += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize_latencies(latencies, time.perf_counter() - started, errors, first_bytes)
+
+async def upstream_calls(port: int) -> int:
+    """Completions served so far by the fake Perplexity"""
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://127.0.0.1:{port}/stats")).json()["calls"]
+
+def start_processes(args) -> Dict:
+    ports = {name: free_port() for name in ("postgrest", "reddit", "perplexity", "app")}
+    
+    fakes = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fakes",
+        "--posts", str(args.posts),
+        "--postgrest-port", str(ports["postgrest"]),
+        "--reddit-port", str(ports["reddit"]),
+        "--perplexity-port", str(ports["perplexity"]),
+        "--postgrest-latency", str(args.postgrest_latency),
+        "--reddit-latency", str(args.reddit_latency),
+        "--perplexity-latency", str(args.perplexity_latency),
+        "--perplexity-token-ms", str(args.perplexity_token_ms),
+        "--perplexity-slow-fraction", str(args.perplexity_slow_fraction),
+        "--perplexity-slow-ms", str(args.perplexity_slow_ms),
+        "--perplexity-error-rate", str(args.perplexity_error_rate),
+        "--jitter", str(args.jitter)
+    ], stdout=subprocess.DEVNULL)
+    
+    env = {
+        **os.environ,
+        "POSTGREST_URL": f"http://127.0.0.1:{ports['postgrest']}",
+        "REDDIT_URL": f"http://127.0.0.1:{ports['reddit']}",
+        "REDDIT_OAUTH_URL": f"http://127.0.0.1:{ports['reddit']}",
+        "PERPLEXITY_BASE_URL": f"http://127.0.0.1:{ports['perplexity']}/chat/completions",
+        "PERPLEXITY_API_KEY": "bench",
+        "HTTP2_ENABLED": "false",
+        "CACHE_BACKEND": "memory",
+        "RATE_LIMIT_BACKEND": "memory",
+        "RATE_LIMIT_PER_MINUTE": str(10 ** 9),
+        "REDDIT_REQUESTS_PER_MINUTE": str(10 ** 6),
+        "REDDIT_REQUEST_BURST": str(10 ** 6),
+        **dict(setting.split("=", 1) for setting in args.set)
+    }
+    app = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1",
+        "--port", str(ports["app"]),
+        "--workers", str(args.workers),
+        "--log-level", "warning",
+        "--no-access-log"
+    ], env=env, stdout=subprocess.DEVNULL)
+    
+    return {"ports": ports, "processes": [app, fakes]}
+
+def stop_processes(processes: List[subprocess.Popen]) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+async def run(args) -> List[Dict]:
+    started = start_processes(args)
+    ports = started["ports"]
+    base_url = f"http://127.0.0.1:{ports['app']}"
+    try:
+        for name in ("postgrest", "reddit", "perplexity"):
+            await wait_until_ready(f"http://127.0.0.1:{ports[name]}/health")
+        await wait_until_ready(f"{base_url}/health")
+        
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+            if not args.no_warm_up and not await warm_up(client):
+                print("Warning: leaderboards were not published; prediction scenarios measure the fallback path")
+            
+            builders = scenarios(perplexity=not args.skip_perplexity)
+            selected = args.scenarios or list(builders)
+            results = []
+            for name in selected:
+                upstream_before = await upstream_calls(ports["perplexity"])
+                summary = await run_scenario(client, builders[name], args.concurrency, args.duration)
+                summary["perplexity_calls"] = await upstream_calls(ports["perplexity"]) - upstream_before
+                results.append({"scenario": name, "concurrency": args.concurrency, **summary})
+                print(f"{name:<30} {summary['requests_per_second']:>9.1f} req/s  "
+                      f"p50 {summary['p50_ms']:8.2f} ms  p99 {summary['p99_ms']:8.2f} ms  "
+                      f"ttfb p50 {summary['ttfb_p50_ms']:8.2f} ms  upstream calls {summary['perplexity_calls']}  errors {summary['errors']}")
+            return results
+    finally:
+        stop_processes(started["processes"])
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="End-to-end API load test against local fake upstreams")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent in-flight requests")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--posts", type=int, default=5000, help="Rows seeded into the fake posts table")
+    parser.add_argument("--postgrest-latency", type=float, default=2.0, help="Milliseconds added per query")
+    parser.add_argument("--reddit-latency", type=float, default=50.0, help="Milliseconds added per listing")
+    parser.add_argument("--perplexity-latency", type=float, default=500.0, help="Milliseconds before the first completion token")
+    parser.add_argument("--perplexity-token-ms", type=float, default=0.0, help="Milliseconds per further completion token")
+    parser.add_argument("--perplexity-slow-fraction", type=float, default=0.0, help="Share of completions delayed by --perplexity-slow-ms")
+    parser.add_argument("--perplexity-slow-ms", type=float, default=0.0, help="Extra milliseconds for slow completions")
+    parser.add_argument("--perplexity-error-rate", type=float, default=0.0, help="Share of completions answered with 503")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency, in milliseconds")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="App setting, e.g. PERPLEXITY_HEDGE_ENABLED=true (repeatable)")
+    parser.add_argument("--scenarios", nargs="+", help="Subset of scenarios to run (default: all)")
+    parser.add_argument("--skip-perplexity", action="store_true", help="Leave out the Perplexity scenarios")
+    parser.add_argument("--no-warm-up", action="store_true", help="Skip the initial collection")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args(argv)
+    
+    results = asyncio.run(run(args))
+    
+    if args.output:
+        config = {key: value for key, value in vars(args).items() if key != "output"}
+        write_results(args.output, "load_test", results, config)
+
+if __name__ == "__main__":
+    main()
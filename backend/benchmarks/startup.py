@@ -0,0 +1,140 @@
+"""
+Startup-time report: import-time breakdown of ``app.main`` and the measured
+cold start of ``uvicorn app.main:app`` (process spawn until /health answers).
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --runs 5 --target-ms 2500 --output startup.json
+
+Exits non-zero when the median cold start misses ``--target-ms``.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import free_port, write_results
+
+def parse_importtime(stderr: str) -> Dict[str, Dict]:
+    """
+    Parse ``python -X importtime`` output into {module: {"self_us", "cumulative_us"}}.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2].strip()
+        modules[name] = {"self_us": self_us, "cumulative_us": cumulative_us}
+    return modules
+
+def import_report(runs: int, env: Dict[str, str]) -> Dict:
+    """
+    Import ``app.main`` in fresh interpreters and keep each module's fastest run.
+    """
+    best: Dict[str, Dict] = {}
+    totals = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            env=env, capture_output=True, text=True, check=True
+        )
+        modules = parse_importtime(result.stderr)
+        totals.append(modules["app.main"]["cumulative_us"])
+        for name, timing in modules.items():
+            if name not in best or timing["cumulative_us"] < best[name]["cumulative_us"]:
+                best[name] = timing
+    
+    by_package = defaultdict(int)
+    for name, timing in best.items():
+        by_package[name.split(".")[0]] += timing["self_us"]
+    
+    return {
+        "app_main_ms": {
+            "min": round(min(totals) / 1000, 1),
+            "median": round(statistics.median(totals) / 1000, 1)
+        },
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(by_package.items(), key=lambda item: -item[1])[:15]
+        },
+        "app_modules_ms": {
+            name: round(timing["cumulative_us"] / 1000, 1)
+            for name, timing in sorted(best.items(), key=lambda item: -item[1]["cumulative_us"])
+            if name.startswith("app.")
+        }
+    }
+
+def cold_start(runs: int, env: Dict[str, str], timeout: float = 60.0) -> List[float]:
+    """
+    Seconds from spawning uvicorn until ``GET /health`` succeeds, once per run.
+    """
+    samples = []
+    for _ in range(runs):
+        port = free_port()
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            while True:
+                try:
+                    if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError("uvicorn did not become healthy in time")
+                time.sleep(0.005)
+            samples.append(time.perf_counter() - started)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time breakdown and uvicorn cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, help="Fail when the median cold start is slower")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+    
+    env = dict(os.environ)
+    imports = import_report(args.runs, env)
+    samples = cold_start(args.runs, env)
+    median_ms = statistics.median(samples) * 1000
+    
+    print(f"import app.main: {imports['app_main_ms']['median']} ms median, {imports['app_main_ms']['min']} ms best")
+    print("\nSelf time by package (ms):")
+    for name, ms in imports["packages_ms"].items():
+        print(f"  {name:<24} {ms:8.1f}")
+    print("\nCumulative import time of app modules (ms):")
+    for name, ms in list(imports["app_modules_ms"].items())[:15]:
+        print(f"  {name:<40} {ms:8.1f}")
+    print(f"\nuvicorn cold start: {median_ms:.0f} ms median over {args.runs} runs (min {min(samples) * 1000:.0f} ms)")
+    
+    results = {
+        "imports": imports,
+        "cold_start_ms": {
+            "median": round(median_ms, 1),
+            "min": round(min(samples) * 1000, 1),
+            "samples": [round(sample * 1000, 1) for sample in samples]
+        },
+        "target_ms": args.target_ms
+    }
+    if args.output:
+        write_results(args.output, "startup", results, {"runs": args.runs})
+    
+    if args.target_ms is not None and median_ms > args.target_ms:
+        print(f"Cold start target of {args.target_ms:.0f} ms missed")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -140,6 +140,37 @@ CREATE TABLE prediction_performance (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Table: posts
+-- Hot posts written by the backend collector (keyed on reddit_id)
+CREATE TABLE IF NOT EXISTS posts (
+    id BIGSERIAL PRIMARY KEY,
+    reddit_id TEXT UNIQUE NOT NULL,
+    subreddit TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT,
+    author TEXT,
+    score INTEGER DEFAULT 0,
+    upvote_ratio REAL,
+    num_comments INTEGER DEFAULT 0,
+    created_utc TIMESTAMP NOT NULL,
+    is_video BOOLEAN DEFAULT FALSE,
+    is_self BOOLEAN DEFAULT FALSE,
+    permalink TEXT,
+    collected_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Table: post_snapshots
+-- Append-only metric history written by the collector (one row per changed post per run)
+CREATE TABLE post_snapshots (
+    reddit_id TEXT NOT NULL,
+    ts TIMESTAMP NOT NULL,
+    score INTEGER NOT NULL,
+    num_comments INTEGER NOT NULL,
+    upvote_ratio REAL,
+    
+    PRIMARY KEY (reddit_id, ts)
+);
+
 -- Create indexes for performance
 CREATE INDEX idx_reddit_posts_subreddit ON reddit_posts(subreddit);
 CREATE INDEX idx_reddit_posts_created ON reddit_posts(created_utc DESC);
@@ -149,6 +180,10 @@ CREATE INDEX idx_predictions_created ON virality_predictions(predicted_at DESC);
 CREATE INDEX idx_predictions_post ON virality_predictions(post_id);
 CREATE INDEX idx_trending_topics_score ON trending_topics(trending_score DESC);
 CREATE INDEX idx_user_email ON user_subscriptions(email);
+CREATE INDEX idx_posts_created_score ON posts(created_utc, score DESC);
+CREATE INDEX idx_posts_subreddit_created ON posts(subreddit, created_utc);
+CREATE INDEX idx_posts_collected ON posts(collected_at DESC);
+CREATE INDEX idx_post_snapshots_ts ON post_snapshots(ts);
 
 -- Create views for easy querying
 CREATE VIEW top_predictions_today AS
@@ -230,6 +265,43 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function to downsample old post snapshots
+-- Keeps the last snapshot per bucket for rows older than p_older_than_hours
+-- and drops everything past the retention window
+CREATE OR REPLACE FUNCTION downsample_post_snapshots(
+    p_older_than_hours INTEGER,
+    p_bucket_minutes INTEGER,
+    p_retention_days INTEGER
+) RETURNS INTEGER AS $$
+DECLARE
+    removed INTEGER;
+    expired INTEGER;
+BEGIN
+    DELETE FROM post_snapshots ps
+    USING (
+        SELECT
+            reddit_id,
+            ts,
+            ROW_NUMBER() OVER (
+                PARTITION BY reddit_id, FLOOR(EXTRACT(EPOCH FROM ts) / (p_bucket_minutes * 60))
+                ORDER BY ts DESC
+            ) AS rn
+        FROM post_snapshots
+        WHERE ts < NOW() - make_interval(hours => p_older_than_hours)
+    ) old
+    WHERE ps.reddit_id = old.reddit_id
+    AND ps.ts = old.ts
+    AND old.rn > 1;
+    GET DIAGNOSTICS removed = ROW_COUNT;
+    
+    DELETE FROM post_snapshots
+    WHERE ts < NOW() - make_interval(days => p_retention_days);
+    GET DIAGNOSTICS expired = ROW_COUNT;
+    
+    RETURN removed + expired;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE user_subscriptions ENABLE ROW LEVEL SECURITY;
 
@@ -254,7 +326,7 @@ VALUES
 DO $$
 BEGIN
     RAISE NOTICE 'Database schema created successfully!';
-    RAISE NOTICE 'Tables created: reddit_posts, virality_predictions, trending_topics, user_subscriptions, prediction_performance';
+    RAISE NOTICE 'Tables created: reddit_posts, virality_predictions, trending_topics, user_subscriptions, prediction_performance, posts, post_snapshots';
     RAISE NOTICE 'Views created: top_predictions_today, prediction_accuracy_overview';
-    RAISE NOTICE 'Functions created: calculate_upvote_velocity, validate_predictions';
+    RAISE NOTICE 'Functions created: calculate_upvote_velocity, validate_predictions, downsample_post_snapshots';
 END $$;